@@ -0,0 +1,224 @@
+"""deep-research 与 image-search 共用的搜索结果磁盘缓存。
+
+以（类别, 查询, 后端, 地区, 时间范围, 结果条数）的内容哈希为键，结果存放在 SQLite 中：
+
+- 按类别设置 TTL，过期后视为未命中
+- stale-while-revalidate：过期但仍在宽限期内的结果先返回，后台线程刷新
+- 总大小超过上限时按最近访问时间（LRU）淘汰；单条结果超过上限时不缓存
+- 统计命中 / 未命中次数，写入研究报告的「搜索概览」
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable
+
+DEFAULT_PATH = Path(
+    os.environ.get("WRITING_SKILL_CACHE_DIR", Path.home() / ".cache" / "oh-my-writing-skill")
+) / "search.sqlite3"
+
+# 各类别结果的有效期（秒）：新闻类文本变化快，图片结果相对稳定
+DEFAULT_TTL = {"text": 24 * 3600, "images": 7 * 24 * 3600}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    key TEXT PRIMARY KEY,
+    category TEXT NOT NULL,
+    query TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    accessed_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_results_accessed ON results (accessed_at);
+"""
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    stale_hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+
+    @property
+    def lookups(self) -> int:
+        return self.hits + self.stale_hits + self.misses
+
+    def summary(self) -> str:
+        """渲染成研究报告「搜索概览」中的一行。"""
+        rate = (self.hits + self.stale_hits) / self.lookups if self.lookups else 0.0
+        return (
+            f"命中 {self.hits + self.stale_hits} 次（其中过期复用 {self.stale_hits} 次），"
+            f"未命中 {self.misses} 次，命中率 {rate:.0%}"
+        )
+
+
+def cache_key(
+    category: str,
+    query: str,
+    backend: str,
+    region: str,
+    timelimit: str | None,
+    max_results: int,
+) -> str:
+    # 结果条数也是查询的一部分：同一关键词要 5 条和要 30 条不能共用一份缓存
+    raw = json.dumps(
+        [category, query, backend, region, timelimit, max_results], ensure_ascii=False
+    )
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class SearchCache:
+    """线程安全的 SQLite 搜索结果缓存。"""
+
+    def __init__(
+        self,
+        path: Path = DEFAULT_PATH,
+        ttl: dict[str, float] | None = None,
+        max_bytes: int = 64 * 1024 * 1024,
+        stale_while_revalidate: float = 0.0,
+    ):
+        self.path = Path(path)
+        self.ttl = {**DEFAULT_TTL, **(ttl or {})}
+        self.max_bytes = max_bytes
+        self.stale_while_revalidate = stale_while_revalidate
+        self.stats = CacheStats()
+        self._lock = threading.Lock()
+        self._revalidating: dict[str, threading.Thread] = {}
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+
+    def get_or_fetch(
+        self,
+        category: str,
+        query: str,
+        backend: str,
+        region: str,
+        timelimit: str | None,
+        max_results: int,
+        fetch: Callable[[], list[dict[str, Any]]],
+    ) -> list[dict[str, Any]]:
+        """读取缓存；未命中时调用 ``fetch`` 并写回。"""
+        return self.lookup(category, query, backend, region, timelimit, max_results, fetch)[0]
+
+    def lookup(
+        self,
+        category: str,
+        query: str,
+        backend: str,
+        region: str,
+        timelimit: str | None,
+        max_results: int,
+        fetch: Callable[[], list[dict[str, Any]]],
+    ) -> tuple[list[dict[str, Any]], str]:
+        """同 :meth:`get_or_fetch`，另外返回本次查找的结果：``hit``、``stale`` 或 ``miss``。
+
+        过期复用时 ``fetch`` 会在后台线程里被调用，调用方不能据此判断是否命中。
+        """
+        key = cache_key(category, query, backend, region, timelimit, max_results)
+        now = time.time()
+        ttl = self.ttl.get(category, DEFAULT_TTL["text"])
+
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT payload, created_at FROM results WHERE key = ?", (key,)
+            ).fetchone()
+            if row is not None:
+                age = now - row[1]
+                if age <= ttl + self.stale_while_revalidate:
+                    self._conn.execute(
+                        "UPDATE results SET accessed_at = ? WHERE key = ?", (now, key)
+                    )
+                    self._conn.commit()
+                    if age <= ttl:
+                        self.stats.hits += 1
+                        return json.loads(row[0]), "hit"
+                    self.stats.stale_hits += 1
+                    self._revalidate(key, category, query, fetch)
+                    return json.loads(row[0]), "stale"
+            self.stats.misses += 1
+
+        results = fetch()
+        self.put(key, category, query, results)
+        return results, "miss"
+
+    def put(self, key: str, category: str, query: str, results: list[dict[str, Any]]) -> None:
+        payload = json.dumps(results, ensure_ascii=False)
+        size = len(payload.encode("utf-8"))
+        if size > self.max_bytes:
+            # 存进去也会立刻被淘汰，还会把其他条目一起挤掉
+            return
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, category, query, payload, size, now, now),
+            )
+            self._evict(keep=key)
+            self._conn.commit()
+
+    def wait(self, timeout: float | None = None) -> None:
+        """等待后台刷新完成，进程退出前调用。"""
+        for thread in list(self._revalidating.values()):
+            thread.join(timeout)
+
+    def close(self) -> None:
+        self.wait()
+        self._conn.close()
+
+    def __enter__(self) -> "SearchCache":
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+    def _revalidate(
+        self,
+        key: str,
+        category: str,
+        query: str,
+        fetch: Callable[[], list[dict[str, Any]]],
+    ) -> None:
+        # 调用方已持有 self._lock
+        if key in self._revalidating:
+            return
+
+        def refresh() -> None:
+            try:
+                self.put(key, category, query, fetch())
+            except Exception:  # noqa: BLE001 - 刷新失败时继续使用旧结果
+                pass
+            finally:
+                with self._lock:
+                    self._revalidating.pop(key, None)
+
+        thread = threading.Thread(target=refresh, name=f"revalidate-{key[:8]}")
+        self._revalidating[key] = thread
+        thread.start()
+
+    def _evict(self, keep: str) -> None:
+        """按 LRU 淘汰到总大小不超过上限，刚写入的 ``keep`` 不淘汰。"""
+        # 调用方已持有 self._lock
+        (total,) = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM results").fetchone()
+        if total <= self.max_bytes:
+            return
+        rows = self._conn.execute("SELECT key, size FROM results ORDER BY accessed_at").fetchall()
+        for key, size in rows:
+            if total <= self.max_bytes:
+                break
+            if key == keep:
+                continue
+            self._conn.execute("DELETE FROM results WHERE key = ?", (key,))
+            total -= size
+            self.stats.evictions += 1
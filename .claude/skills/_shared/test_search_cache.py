@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+import pytest
+
+import search_cache
+from search_cache import SearchCache
+
+
+class Clock:
+    def __init__(self) -> None:
+        self.now = 1_000_000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch) -> Clock:
+    clock = Clock()
+    monkeypatch.setattr(search_cache.time, "time", clock)
+    return clock
+
+
+def _results(tag: str, n: int = 3) -> list[dict[str, str]]:
+    return [{"title": f"{tag} #{i}", "href": f"https://example.com/{tag}/{i}"} for i in range(n)]
+
+
+def _lookup(cache: SearchCache, query: str, results, max_results: int = 10):
+    return cache.get_or_fetch(
+        "text", query, "duckduckgo", "cn-zh", None, max_results, lambda: results
+    )
+
+
+def _size(results) -> int:
+    return len(json.dumps(results, ensure_ascii=False).encode("utf-8"))
+
+
+def test_entry_expires_after_ttl(tmp_path: Path, clock: Clock):
+    with SearchCache(tmp_path / "cache.sqlite3", ttl={"text": 60}) as cache:
+        assert _lookup(cache, "酱油", _results("old")) == _results("old")
+        clock.now += 59
+        assert _lookup(cache, "酱油", _results("new")) == _results("old")
+        clock.now += 2
+        assert _lookup(cache, "酱油", _results("new")) == _results("new")
+        assert (cache.stats.hits, cache.stats.misses) == (1, 2)
+
+
+def test_stale_hit_is_served_then_refreshed(tmp_path: Path, clock: Clock):
+    path = tmp_path / "cache.sqlite3"
+    with SearchCache(path, ttl={"text": 60}, stale_while_revalidate=600) as cache:
+        _lookup(cache, "酱油", _results("old"))
+        clock.now += 120
+        assert _lookup(cache, "酱油", _results("new")) == _results("old")
+        cache.wait()
+        assert _lookup(cache, "酱油", _results("newer")) == _results("new")
+        assert (cache.stats.stale_hits, cache.stats.hits, cache.stats.misses) == (1, 1, 1)
+
+
+def test_eviction_drops_least_recently_used(tmp_path: Path, clock: Clock):
+    entry = _results("a")
+    with SearchCache(tmp_path / "cache.sqlite3", max_bytes=_size(entry) * 2 + 10) as cache:
+        _lookup(cache, "a", _results("a"))
+        clock.now += 1
+        _lookup(cache, "b", _results("b"))
+        clock.now += 1
+        _lookup(cache, "a", _results("unused"))  # 访问 a，b 变为最久未用
+        clock.now += 1
+        _lookup(cache, "c", _results("c"))
+
+        assert cache.stats.evictions == 1
+        assert _lookup(cache, "a", _results("x")) == _results("a")
+        assert _lookup(cache, "c", _results("x")) == _results("c")
+        assert _lookup(cache, "b", _results("x")) == _results("x")
+
+
+def test_oversized_payload_is_not_cached_and_evicts_nothing(tmp_path: Path, clock: Clock):
+    small = _results("s", 1)
+    with SearchCache(tmp_path / "cache.sqlite3", max_bytes=_size(small) * 5 + 50) as cache:
+        for i in range(5):
+            _lookup(cache, f"q{i}", _results("s", 1))
+        huge = _results("h", 50)
+        assert _lookup(cache, "huge", huge) == huge
+
+        assert cache.stats.evictions == 0
+        for i in range(5):
+            assert _lookup(cache, f"q{i}", _results("x")) == _results("s", 1)
+        assert _lookup(cache, "huge", _results("again")) == _results("again")
+
+
+def test_max_results_is_part_of_the_key(tmp_path: Path, clock: Clock):
+    with SearchCache(tmp_path / "cache.sqlite3") as cache:
+        assert len(_lookup(cache, "酱油", _results("q", 5), max_results=5)) == 5
+        assert len(_lookup(cache, "酱油", _results("q", 30), max_results=30)) == 30
+        assert len(_lookup(cache, "酱油", _results("x", 1), max_results=5)) == 5
+        assert (cache.stats.hits, cache.stats.misses) == (1, 2)
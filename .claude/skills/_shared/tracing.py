@@ -0,0 +1,200 @@
+"""各 Skill 辅助脚本共用的轻量追踪：记录每一步的耗时、传输字节、缓存命中和重试次数。
+
+每个 span 结束时向文章目录下的 ``trace.jsonl`` 追加一行 JSON：
+
+    {"name": "deep-research.search", "span": "1a2b-3", "parent": null, "start": 1760000000.0,
+     "duration_ms": 5321.4, "peak_rss_kb": 81234, "bytes": 0, "cache_hits": 12, "retries": 2, ...}
+
+- span 可以嵌套，父子关系通过 contextvars 传递；线程池中的任务用 ``parent=`` 显式指定
+- ``add()`` 累加计数（字节数、命中次数等），``set()`` 记录任意属性
+- LLM 执行的阶段（写作、人性化、平台转换）由 pipeline.py 在阶段完成时用 ``record()`` 补记
+- 环境变量 ``WRITING_SKILL_TRACE=0`` 关闭追踪；关闭时 span 不做任何 I/O
+
+用法：
+    python tracing.py summary output/主题/trace.jsonl
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextvars
+import itertools
+import json
+import os
+import sys
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Iterator
+
+TRACE_FILE = "trace.jsonl"
+# 汇总时按这些计数字段求和
+COUNTERS = ("bytes", "cache_hits", "retries")
+
+_current: contextvars.ContextVar[str | None] = contextvars.ContextVar("span", default=None)
+_ids = itertools.count(1)
+
+
+def peak_rss_kb(children: bool = False) -> int | None:
+    """峰值常驻内存（KB），无法获取时返回 None。
+
+    ``children=True`` 时返回已结束子进程（如进程池工作进程）中最大的一个。
+    """
+    if not children:
+        # ru_maxrss 会继承 exec 之前的进程，优先读 VmHWM
+        try:
+            with open("/proc/self/status", encoding="ascii") as f:
+                for line in f:
+                    if line.startswith("VmHWM:"):
+                        return int(line.split()[1])
+        except OSError:
+            pass
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    who = resource.RUSAGE_CHILDREN if children else resource.RUSAGE_SELF
+    rss = resource.getrusage(who).ru_maxrss
+    # macOS 以字节为单位，Linux 以 KB 为单位
+    return rss // 1024 if sys.platform == "darwin" else rss
+
+
+class Span:
+    def __init__(self, name: str, parent: str | None, attrs: dict[str, Any]):
+        self.name = name
+        self.id = f"{os.getpid():x}-{next(_ids)}"
+        self.parent = parent
+        self.attrs = dict(attrs)
+        self._lock = threading.Lock()
+
+    def set(self, **attrs: Any) -> None:
+        with self._lock:
+            self.attrs.update(attrs)
+
+    def add(self, key: str, value: int | float = 1) -> None:
+        """累加计数；线程池中的多个任务可以同时更新同一个 span。"""
+        with self._lock:
+            self.attrs[key] = self.attrs.get(key, 0) + value
+
+
+class Tracer:
+    """把 span 以 JSON Lines 追加写入文件；``path`` 为 None 时不记录。"""
+
+    def __init__(self, path: Path | None, stage: str | None = None):
+        self.path = path
+        self.stage = stage
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.path is not None
+
+    @staticmethod
+    def current() -> str | None:
+        """当前线程上下文中的 span 编号，提交到线程池前取出传给 ``parent=``。"""
+        return _current.get()
+
+    @contextmanager
+    def span(self, name: str, parent: str | None = None, **attrs: Any) -> Iterator[Span]:
+        span = Span(name, parent if parent is not None else _current.get(), attrs)
+        token = _current.set(span.id)
+        start = time.time()
+        t0 = time.perf_counter()
+        try:
+            yield span
+        except BaseException as e:
+            span.set(error=f"{type(e).__name__}: {e}")
+            raise
+        finally:
+            _current.reset(token)
+            if self.enabled:
+                self._write(span, start, (time.perf_counter() - t0) * 1000)
+
+    def record(self, name: str, start: float, duration_ms: float, **attrs: Any) -> None:
+        """补记一段不在本进程内执行的耗时，例如由 LLM 完成的阶段。"""
+        if self.enabled:
+            self._write(Span(name, None, attrs), start, duration_ms)
+
+    def _write(self, span: Span, start: float, duration_ms: float) -> None:
+        entry = {
+            "name": span.name,
+            "span": span.id,
+            "parent": span.parent,
+            "stage": self.stage,
+            "start": round(start, 3),
+            "duration_ms": round(duration_ms, 2),
+            "peak_rss_kb": peak_rss_kb(),
+            **span.attrs,
+        }
+        line = json.dumps(entry, ensure_ascii=False, default=str) + "\n"
+        if self.path is None:
+            return
+        with self._lock, self.path.open("a", encoding="utf-8") as f:
+            f.write(line)
+
+
+def open_tracer(article_dir: Path | None, stage: str | None = None) -> Tracer:
+    """文章目录下的追踪器；未指定目录或 ``WRITING_SKILL_TRACE=0`` 时返回不记录的追踪器。"""
+    disabled = os.environ.get("WRITING_SKILL_TRACE", "1").lower() in ("0", "off", "false")
+    if article_dir is None or disabled:
+        return Tracer(None, stage)
+    article_dir.mkdir(parents=True, exist_ok=True)
+    return Tracer(article_dir / TRACE_FILE, stage)
+
+
+def load(path: Path) -> list[dict[str, Any]]:
+    with path.open(encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def summarize(entries: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    """按 span 名称汇总次数、总耗时、最长耗时和各项计数。"""
+    groups: dict[str, list[dict[str, Any]]] = defaultdict(list)
+    for entry in entries:
+        groups[entry["name"]].append(entry)
+    rows = []
+    for name, items in groups.items():
+        durations = sorted(e["duration_ms"] for e in items)
+        row: dict[str, Any] = {
+            "name": name,
+            "count": len(items),
+            "total_ms": round(sum(durations), 1),
+            "p50_ms": durations[len(durations) // 2],
+            "max_ms": durations[-1],
+            "peak_rss_kb": max((e.get("peak_rss_kb") or 0) for e in items) or None,
+            "errors": sum("error" in e for e in items),
+        }
+        for key in COUNTERS:
+            row[key] = sum(e.get(key) or 0 for e in items)
+        rows.append(row)
+    return sorted(rows, key=lambda r: r["total_ms"], reverse=True)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="追踪记录工具")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p_summary = sub.add_parser("summary", help="按 span 名称汇总耗时")
+    p_summary.add_argument("trace", type=Path, help="trace.jsonl 路径或文章目录")
+    p_summary.add_argument("--json", action="store_true", help="以 JSON 输出")
+    args = parser.parse_args()
+
+    path = args.trace / TRACE_FILE if args.trace.is_dir() else args.trace
+    rows = summarize(load(path))
+    if args.json:
+        print(json.dumps(rows, ensure_ascii=False, indent=2))
+        return 0
+    for row in rows:
+        extra = "，".join(f"{k} {row[k]}" for k in COUNTERS if row[k])
+        print(
+            f"{row['name']}：{row['count']} 次，共 {row['total_ms']:.0f} ms，"
+            f"p50 {row['p50_ms']:.0f} ms，最长 {row['max_ms']:.0f} ms"
+            + (f"，{extra}" if extra else "")
+            + (f"，失败 {row['errors']} 次" if row["errors"] else "")
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,284 @@
+"""整条流水线的离线回放基准：用 examples/ 里的录制数据驱动各辅助脚本，按阶段统计耗时和内存。
+
+- 搜索：本地假 DDGS 后端回放示例 research*.md 中的结果，带固定延迟和限流
+- 配图：本地 HTTP 服务模拟图床，提供示例配图以及重复、过小、非图片、超大等干扰候选
+- 图片处理、规则预处理、多平台后处理直接在示例文件的副本上运行
+
+每轮在新的临时文章目录中运行（冷缓存；``--warm`` 时各轮共享搜索缓存和图片库），
+各阶段的 span 写入该目录的 trace.jsonl。``--save`` 保存各阶段中位数作为基线，
+``--baseline`` 与之对比，耗时或峰值内存超出容差时返回非零退出码。
+
+用法：
+    python bench_pipeline.py --example 酱油词汇演变 --rounds 3
+    python bench_pipeline.py --save baseline.json
+    python bench_pipeline.py --baseline baseline.json --tolerance 0.2
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import shutil
+import statistics
+import sys
+import tempfile
+import threading
+import zlib
+from functools import partial
+from pathlib import Path
+from typing import Any
+
+SKILLS = Path(__file__).resolve().parents[2]
+for _dir in (
+    "_shared",
+    "deep-research/scripts",
+    "image-search/scripts",
+    "image-processing/scripts",
+    "humanizer-cn/scripts",
+):
+    sys.path.insert(0, str(SKILLS / _dir))
+
+from bench_download import QuietServer, SlowHandler, make_fixtures  # noqa: E402
+from bench_search import FakeBackend  # noqa: E402
+from convert import convert, parse_article  # noqa: E402
+from image_download import ImageDownloader  # noqa: E402
+from image_search import search_images  # noqa: E402
+from phash_index import PerceptualIndex  # noqa: E402
+from prepass import prepass  # noqa: E402
+from process_images import process_directory  # noqa: E402
+from research import parse_report, research  # noqa: E402
+from search_cache import SearchCache  # noqa: E402
+from search_engine import DEFAULT_BACKENDS, ConcurrentSearcher, SearchResult  # noqa: E402
+from tracing import COUNTERS, TRACE_FILE, Tracer, load, peak_rss_kb, summarize  # noqa: E402
+
+PLATFORMS = ["zhihu", "xiaohongshu", "wechat"]
+# 回放时复制到临时文章目录的录制文件
+FIXTURES = ("draft.md", "humanized.md", "zhihu.md", "xiaohongshu.md", "wechat.md")
+
+
+class ReplayBackend(FakeBackend):
+    """按（关键词, 后端）稳定地轮换回放示例报告中的结果。"""
+
+    def __init__(self, recorded: list[SearchResult], **kwargs: Any):
+        super().__init__(**kwargs)
+        self.recorded = recorded
+
+    def results(self, query: str, backend: str, max_results: int) -> list[dict[str, Any]]:
+        if not self.recorded:
+            return []
+        offset = zlib.crc32(f"{query}\0{backend}".encode("utf-8"))
+        n = min(max_results, len(self.recorded))
+        picked = (self.recorded[(offset + i) % len(self.recorded)] for i in range(n))
+        return [{"title": r.title, "href": r.url, "body": r.snippet} for r in picked]
+
+
+class ImageHost:
+    """本地图床：示例配图放在干扰候选之后，下载器需要跳过干扰项才能拿到真图。"""
+
+    def __init__(self, root: Path, images: list[Path], latency: float, decoys: int):
+        root.mkdir(parents=True, exist_ok=True)
+        # 只保留应被拒绝的干扰项（过小、非图片、超大），排名最后的才是真图
+        fixtures = make_fixtures(root, decoys * 5 // 3 + 5)
+        self.decoys = [n for n in fixtures if not n.startswith(("dup_", "ok_"))][:decoys]
+        self.images = []
+        for image in images:
+            shutil.copy(image, root / image.name)
+            self.images.append(image.name)
+        handler = partial(SlowHandler, directory=str(root))
+        SlowHandler.latency = latency
+        self.server = QuietServer(("127.0.0.1", 0), handler)
+        self.base = f"http://127.0.0.1:{self.server.server_address[1]}"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def search_fn(
+        self,
+        query: str,
+        region: str,
+        timelimit: str | None,
+        max_results: int,
+    ) -> list[dict[str, Any]]:
+        name = self.images[zlib.crc32(query.encode("utf-8")) % len(self.images)]
+        names = [*self.decoys, name][-max_results:]
+        return [{"title": query, "image": f"{self.base}/{n}"} for n in names]
+
+    def close(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def reset_peak_rss() -> None:
+    """清零 VmHWM，让每个阶段的峰值内存互不影响（仅 Linux）。"""
+    try:
+        with open("/proc/self/clear_refs", "w", encoding="ascii") as f:
+            f.write("5")
+    except OSError:
+        pass
+
+
+def run_round(
+    example: Path,
+    article_dir: Path,
+    shared: Path,
+    host: ImageHost,
+    latency: float,
+) -> None:
+    for name in FIXTURES:
+        if (example / name).exists():
+            shutil.copy(example / name, article_dir / name)
+    # 各阶段的统计全部来自 trace.jsonl，不受 WRITING_SKILL_TRACE 影响
+    tracer = Tracer(article_dir / TRACE_FILE, "bench")
+    # research.md 之外的补充报告（research_supplement.md 等）也一并回放
+    paths = sorted(example.glob("research*.md"))
+    reports = {p.name: parse_report(p.read_text(encoding="utf-8")) for p in paths}
+    topic = reports["research.md"][0]
+    recorded = [r for _, results in reports.values() for r in results]
+
+    reset_peak_rss()
+    cache = SearchCache(shared / "search.sqlite3")
+    with tracer.span("bench.deep-research"):
+        searcher = ConcurrentSearcher(
+            search_fn=ReplayBackend(recorded, latency=latency, throttle_rate=0.05),
+            backend_interval=0.0,
+            retry_base_delay=0.05,
+            cache=cache,
+            tracer=tracer,
+        )
+        backends = list(DEFAULT_BACKENDS)
+        research(topic, article_dir / "research.md", searcher, backends, tracer=tracer)
+
+    reset_peak_rss()
+    article = parse_article((example / "humanized.md").read_text(encoding="utf-8"))
+    queries = [img.alt for img in article.images]
+    if not queries:
+        queries = [p.stem for p in sorted((example / "images").iterdir())]
+    downloader = ImageDownloader(index=PerceptualIndex(shared / "images"), tracer=tracer)
+    with tracer.span("bench.image-search"):
+        for i, query in enumerate(queries, 1):
+            with tracer.span("image-search.search", query=query):
+                candidates = search_images(query, cache=cache, search_fn=host.search_fn)
+            with tracer.span("image-search.download", query=query) as span:
+                result = downloader.download(
+                    [c["image"] for c in candidates], article_dir / "images", keep=1, start_index=i
+                )
+                span.set(
+                    bytes=result.bytes_transferred, saved=len(result.saved), reused=result.reused
+                )
+    cache.close()
+
+    reset_peak_rss()
+    with tracer.span("bench.image-processing") as span:
+        results = process_directory(article_dir / "images", "zhihu")
+        # 图片在进程池里处理，本进程的 VmHWM 看不到；子进程峰值无法清零，是到本轮为止的最大值
+        span.set(
+            files=len(results),
+            bytes=sum(r.bytes_before for r in results),
+            children_peak_rss_kb=peak_rss_kb(children=True),
+        )
+
+    reset_peak_rss()
+    with tracer.span("bench.humanizer-cn") as span:
+        draft = (article_dir / "draft.md").read_text(encoding="utf-8")
+        span.set(bytes=len(draft.encode("utf-8")), flagged=len(prepass(draft).flagged))
+
+    reset_peak_rss()
+    with tracer.span("bench.convert"):
+        # 只后处理示例里录制了转换稿的平台
+        platforms = [p for p in PLATFORMS if (article_dir / f"{p}.md").exists()]
+        convert(article_dir, platforms, tracer=tracer)
+
+
+def stage_stats(rounds: list[list[dict[str, Any]]]) -> dict[str, dict[str, float]]:
+    """各轮 ``bench.*`` 阶段耗时的中位数和峰值内存的最大值。
+
+    记录了子进程峰值的阶段（图片处理）取本进程与子进程中较大的一个。
+    """
+    stats: dict[str, dict[str, float]] = {}
+    names = [e["name"] for e in rounds[0] if e["name"].startswith("bench.")]
+    for name in names:
+        entries = [e for entries in rounds for e in entries if e["name"] == name]
+        stats[name.removeprefix("bench.")] = {
+            "ms": round(statistics.median(e["duration_ms"] for e in entries), 1),
+            "peak_rss_kb": max(
+                max(e.get("peak_rss_kb") or 0, e.get("children_peak_rss_kb") or 0)
+                for e in entries
+            ),
+        }
+    return stats
+
+
+def compare(
+    stats: dict[str, dict[str, float]],
+    baseline: dict[str, dict[str, float]],
+    tolerance: float,
+) -> bool:
+    ok = True
+    for stage, base in baseline.items():
+        current = stats.get(stage)
+        if current is None:
+            continue
+        for key in ("ms", "peak_rss_kb"):
+            if base[key] and current[key] > base[key] * (1 + tolerance):
+                ok = False
+                change = current[key] / base[key] - 1
+                print(f"  回退：{stage} {key} {base[key]} → {current[key]}（+{change:.0%}）")
+    return ok
+
+
+def main() -> int:
+    default_examples = Path(__file__).resolve().parents[4] / "examples"
+    parser = argparse.ArgumentParser(description="流水线离线回放基准测试")
+    parser.add_argument("--examples", type=Path, default=default_examples, help="示例目录")
+    parser.add_argument("--example", help="只回放某一个示例，默认第一个")
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--latency", type=float, default=0.05, help="假搜索后端和图床的请求延迟（秒）")
+    parser.add_argument("--decoys", type=int, default=4, help="每次图片搜索返回的干扰候选数")
+    parser.add_argument("--warm", action="store_true", help="各轮共享搜索缓存和本地图片库")
+    parser.add_argument("--save", type=Path, help="把各阶段结果保存为基线")
+    parser.add_argument("--baseline", type=Path, help="与基线对比")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="允许的相对回退幅度")
+    parser.add_argument("--trace-out", type=Path, help="保存最后一轮的 trace.jsonl")
+    args = parser.parse_args()
+
+    examples = sorted(p for p in args.examples.iterdir() if (p / "research.md").exists())
+    example = next(p for p in examples if args.example in (None, p.name))
+    print(f"回放示例：{example.name}，{args.rounds} 轮（{'热' if args.warm else '冷'}缓存）")
+
+    rounds: list[list[dict[str, Any]]] = []
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp_root = Path(tmp)
+        images = sorted((example / "images").iterdir())
+        host = ImageHost(tmp_root / "host", images, args.latency, args.decoys)
+        try:
+            for i in range(args.rounds):
+                article_dir = tmp_root / f"round_{i}" / example.name
+                article_dir.mkdir(parents=True)
+                shared = tmp_root / "shared" if args.warm else tmp_root / f"round_{i}" / "shared"
+                run_round(example, article_dir, shared, host, args.latency)
+                rounds.append(load(article_dir / TRACE_FILE))
+        finally:
+            host.close()
+        if args.trace_out:
+            lines = [json.dumps(e, ensure_ascii=False) + "\n" for e in rounds[-1]]
+            args.trace_out.write_text("".join(lines), encoding="utf-8")
+
+    stats = stage_stats(rounds)
+    print("各阶段（中位数耗时 / 峰值内存）：")
+    for stage, s in stats.items():
+        print(f"  {stage}：{s['ms']:.0f} ms / {s['peak_rss_kb'] / 1024:.0f} MB")
+    print("最后一轮明细：")
+    for row in summarize(rounds[-1]):
+        if not row["name"].startswith("bench."):
+            extra = "".join(f"，{k} {row[k]}" for k in COUNTERS if row[k])
+            print(f"  {row['name']}：{row['count']} 次，共 {row['total_ms']:.0f} ms{extra}")
+
+    if args.save:
+        args.save.write_text(json.dumps(stats, ensure_ascii=False, indent=2), encoding="utf-8")
+    if args.baseline:
+        ok = compare(stats, json.loads(args.baseline.read_text(encoding="utf-8")), args.tolerance)
+        print("与基线一致" if ok else "存在回退")
+        return 0 if ok else 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,32 @@
+from __future__ import annotations
+
+import os
+import shutil
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+EXAMPLES = Path(__file__).resolve().parents[4] / "examples"
+SCRIPTS = Path(__file__).resolve().parent
+
+
+@pytest.fixture
+def article_dir(tmp_path: Path) -> Path:
+    """复制一份示例文章，测试可以随意改写。"""
+    path = tmp_path / "酱油词汇演变"
+    shutil.copytree(EXAMPLES / "酱油词汇演变", path)
+    return path
+
+
+def run_script(script: str, *args: str, check: bool = False) -> subprocess.CompletedProcess[str]:
+    """以子进程运行本目录下的脚本，关闭追踪以免在示例目录里留下 trace.jsonl。"""
+    env = {**os.environ, "WRITING_SKILL_TRACE": "0"}
+    return subprocess.run(
+        [sys.executable, str(SCRIPTS / script), *args],
+        capture_output=True,
+        text=True,
+        env=env,
+        check=check,
+    )
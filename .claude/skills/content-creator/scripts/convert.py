@@ -0,0 +1,348 @@
+"""多平台转换的并行分发与确定性后处理。
+
+humanized.md 只解析一次，得到标题、章节、配图引用和参考资料列表，
+各平台的后处理并行地基于这份结构完成，不再各自重新解析 Markdown：
+
+- 配图路径校正：image-processing 改了扩展名（如 image_005.png → image_005.jpg）时同步引用
+- 配图补全：知乎、微信稿里丢掉的配图，按原章节位置补回
+- 参考资料：converter 没有保留参考资料时按平台格式从共享列表生成；微信正文外链改为文末编号引用
+- 平台限制检查：小红书标题和正文字数
+
+转换稿（zhihu.md 等）由对应的 converter 写出，本脚本只做后处理；某个平台的转换稿不存在时
+记为该平台失败并以非零退出码结束，不会自行生成替代稿。目标平台默认取 ``.pipeline.json``
+中的运行配置。每个平台的结果原子写入，耗时记录在 conversion.json 和 trace.jsonl。
+
+用法：
+    python convert.py output/主题
+    python convert.py output/主题 --platforms zhihu,xiaohongshu
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import re
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "_shared"))
+
+from pipeline import load_manifest  # noqa: E402
+from tracing import Tracer, open_tracer  # noqa: E402
+
+_HEADING = re.compile(r"^(#{1,6})\s+(.*)$")
+_IMAGE = re.compile(r"!\[([^\]]*)\]\(([^)\s]+)\)")
+_LINK = re.compile(r"(?<!!)\[([^\]]+)\]\((https?://[^)\s]+)\)")
+_SOURCES_TITLE = re.compile(r"^\W*(?:本文)?参考(?:资料|来源)\W*$")
+_LIST_ITEM = re.compile(r"^(?:>\s*)?(?:[-*]|\d+\.)\s+(.*)$")
+
+XIAOHONGSHU_TITLE_LIMIT = 20
+XIAOHONGSHU_BODY_LIMIT = 1000
+
+
+@dataclass
+class ImageRef:
+    alt: str
+    path: str
+    section: int
+
+
+@dataclass
+class Section:
+    level: int
+    heading: str
+    lines: list[str] = field(default_factory=list)
+
+
+@dataclass
+class Source:
+    text: str
+    url: str | None = None
+
+
+@dataclass
+class Article:
+    title: str
+    sections: list[Section]
+    images: list[ImageRef]
+    sources: list[Source]
+
+
+def _split_sources(lines: list[str]) -> tuple[list[str], list[str], list[str]]:
+    """把文末参考资料块切出来，返回（正文, 参考资料块, 之后的结尾）。"""
+    for i in range(len(lines) - 1, -1, -1):
+        if _SOURCES_TITLE.match(lines[i].strip().strip("*>").strip()):
+            end = i + 1
+            while end < len(lines) and (
+                not lines[end].strip() or _LIST_ITEM.match(lines[end].strip())
+            ):
+                end += 1
+            return lines[:i], lines[i:end], lines[end:]
+    return lines, [], []
+
+
+def parse_article(text: str) -> Article:
+    lines = text.replace("\r\n", "\n").split("\n")
+    body, source_lines, _ = _split_sources(lines)
+
+    title = ""
+    sections = [Section(0, "")]
+    images: list[ImageRef] = []
+    for line in body:
+        m = _HEADING.match(line)
+        if m and len(m.group(1)) == 1 and not title:
+            title = m.group(2).strip()
+            continue
+        if m:
+            sections.append(Section(len(m.group(1)), m.group(2).strip()))
+            continue
+        sections[-1].lines.append(line)
+        for alt, path in _IMAGE.findall(line):
+            images.append(ImageRef(alt, path, len(sections) - 1))
+
+    sources = []
+    for line in source_lines:
+        m = _LIST_ITEM.match(line.strip())
+        if not m:
+            continue
+        item = m.group(1).strip()
+        link = _LINK.search(item)
+        sources.append(Source(link.group(1), link.group(2)) if link else Source(item))
+    return Article(title, sections, images, sources)
+
+
+def fix_image_paths(text: str, article_dir: Path) -> str:
+    """引用的图片不存在但同名不同扩展名的文件存在时，改为实际文件。"""
+
+    def repl(m: re.Match[str]) -> str:
+        alt, path = m.group(1), m.group(2)
+        target = article_dir / path
+        if target.exists() or path.startswith(("http://", "https://")):
+            return m.group(0)
+        matches = sorted(target.parent.glob(f"{target.stem}.*")) if target.parent.is_dir() else []
+        if not matches:
+            return m.group(0)
+        return f"![{alt}]({Path(path).parent.joinpath(matches[0].name).as_posix()})"
+
+    return _IMAGE.sub(repl, text)
+
+
+def _section_end(body: list[str], start: int, level: int) -> int:
+    """章节结束位置：下一个同级或更高级标题 / 分隔线之前。"""
+    for j in range(start + 1, len(body)):
+        if body[j].strip() == "---":
+            return j
+        h = _HEADING.match(body[j])
+        if h and len(h.group(1)) <= level:
+            return j
+    return len(body)
+
+
+def restore_images(body: list[str], article: Article) -> list[str]:
+    """把转换稿中丢失的配图补回原章节末尾。
+
+    转换稿常会改写小标题，找不到同名章节时按原文二级章节的相对位置映射。
+    """
+    present = {path for _, path in _IMAGE.findall("\n".join(body))}
+    missing = [img for img in article.images if img.path not in present]
+    if not missing:
+        return body
+    body = list(body)
+    source_h2 = [i for i, s in enumerate(article.sections) if s.level == 2]
+
+    for img in missing:
+        section = article.sections[img.section]
+        headings = [(i, _HEADING.match(line)) for i, line in enumerate(body)]
+        headings = [(i, m) for i, m in headings if m]
+        target = next(
+            ((i, m) for i, m in headings if section.heading and section.heading in m.group(2)),
+            None,
+        )
+        if target is None:
+            h2 = [(i, m) for i, m in headings if len(m.group(1)) == 2]
+            before = [i for i in source_h2 if i <= img.section]
+            if h2 and before:
+                ratio = source_h2.index(before[-1]) / max(len(source_h2), 1)
+                target = h2[min(int(ratio * len(h2)), len(h2) - 1)]
+        if target is None:
+            insert_at = len(body)
+        else:
+            insert_at = _section_end(body, target[0], len(target[1].group(1)))
+        while insert_at > 0 and not body[insert_at - 1].strip():
+            insert_at -= 1
+        body[insert_at:insert_at] = ["", f"![{img.alt}]({img.path})"]
+    return body
+
+
+def render_sources(sources: list[Source], platform: str) -> str:
+    if not sources:
+        return ""
+    if platform == "xiaohongshu":
+        return "📚 参考资料：\n" + "\n".join(f"- {s.text}" for s in sources)
+    if platform == "wechat":
+        return "**参考资料**\n\n" + "\n".join(
+            f"[{i}] {s.text}" + (f"：{s.url}" if s.url else "") for i, s in enumerate(sources, 1)
+        )
+    return "**参考资料：**\n\n" + "\n".join(
+        f"{i}. " + (f"[{s.text}]({s.url})" if s.url else s.text) for i, s in enumerate(sources, 1)
+    )
+
+
+def links_to_footnotes(text: str, sources: list[Source]) -> tuple[str, list[Source]]:
+    """微信公众号正文外链不可点击：改为「文字[n]」，链接并入参考资料。"""
+    sources = list(sources)
+    by_url = {s.url: i for i, s in enumerate(sources, 1) if s.url}
+
+    def repl(m: re.Match[str]) -> str:
+        label, url = m.group(1), m.group(2)
+        if url not in by_url:
+            sources.append(Source(label, url))
+            by_url[url] = len(sources)
+        return f"{label}[{by_url[url]}]"
+
+    return _LINK.sub(repl, text), sources
+
+
+def _assemble(body: list[str], sources: str, after: list[str]) -> str:
+    while body and body[-1].strip() in ("", "---"):
+        body = body[:-1]
+    parts = ["\n".join(body)]
+    if sources:
+        parts += ["---", sources]
+    tail = "\n".join(after).strip()
+    if tail:
+        parts.append(tail)
+    return "\n\n".join(parts) + "\n"
+
+
+def _finalize(
+    text: str,
+    article: Article,
+    platform: str,
+    with_images: bool,
+) -> tuple[list[str], str, list[str]]:
+    """通用步骤：补配图；converter 自己挑选过参考资料时保留，否则按共享列表生成。"""
+    body, block, after = _split_sources(text.split("\n"))
+    if with_images:
+        body = restore_images(body, article)
+    sources = "\n".join(block).strip() if block else render_sources(article.sources, platform)
+    return body, sources, after
+
+
+def finalize_zhihu(text: str, article: Article, warnings: list[str]) -> str:
+    return _assemble(*_finalize(text, article, "zhihu", with_images=True))
+
+
+def finalize_wechat(text: str, article: Article, warnings: list[str]) -> str:
+    body, block, after = _split_sources(text.split("\n"))
+    body = restore_images(body, article)
+    linked, sources = links_to_footnotes("\n".join(body), article.sources)
+    if block and len(sources) == len(article.sources):
+        rendered = "\n".join(block).strip()
+    else:
+        rendered = render_sources(sources, "wechat")
+    return _assemble(linked.split("\n"), rendered, after)
+
+
+def finalize_xiaohongshu(text: str, article: Article, warnings: list[str]) -> str:
+    body, sources, after = _finalize(text, article, "xiaohongshu", with_images=False)
+    parsed = parse_article("\n".join(body))
+    if len(parsed.title) > XIAOHONGSHU_TITLE_LIMIT:
+        warnings.append(f"标题 {len(parsed.title)} 字，超过小红书 {XIAOHONGSHU_TITLE_LIMIT} 字限制")
+    body_len = sum(len(line.strip()) for s in parsed.sections for line in s.lines)
+    if body_len > XIAOHONGSHU_BODY_LIMIT:
+        warnings.append(f"正文约 {body_len} 字，超过小红书 {XIAOHONGSHU_BODY_LIMIT} 字限制")
+    return _assemble(body, sources, after)
+
+
+FINALIZERS: dict[str, Callable[[str, Article, list[str]], str]] = {
+    "zhihu": finalize_zhihu,
+    "xiaohongshu": finalize_xiaohongshu,
+    "wechat": finalize_wechat,
+}
+
+
+def write_atomic(path: Path, text: str) -> None:
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_text(text, encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def convert_platform(article_dir: Path, article: Article, platform: str) -> dict[str, object]:
+    start = time.perf_counter()
+    path = article_dir / f"{platform}.md"
+    if not path.exists():
+        # 不拿源稿凑一份替代稿：那样会掩盖 converter 的失败，pipeline 也查不出输出缺失
+        raise FileNotFoundError(f"{path.name} 不存在，{platform} 的 converter 尚未输出")
+    text = path.read_text(encoding="utf-8").replace("\r\n", "\n")
+    warnings: list[str] = []
+    text = fix_image_paths(FINALIZERS[platform](text, article, warnings), article_dir)
+    write_atomic(path, text)
+    return {
+        "bytes": len(text.encode("utf-8")),
+        "elapsed_ms": round((time.perf_counter() - start) * 1000, 2),
+        "warnings": warnings,
+    }
+
+
+def convert(
+    article_dir: Path,
+    platforms: list[str],
+    source: str = "humanized.md",
+    tracer: Tracer | None = None,
+) -> dict[str, object]:
+    """并行完成各平台的后处理，返回并写入每个平台的耗时信息。"""
+    tracer = tracer or Tracer(None)
+    with tracer.span("convert.parse", source=source):
+        article = parse_article((article_dir / source).read_text(encoding="utf-8"))
+    parent = tracer.current()
+
+    def run(platform: str) -> dict[str, object]:
+        with tracer.span(f"convert.{platform}", parent) as span:
+            info = convert_platform(article_dir, article, platform)
+            span.set(bytes=info["bytes"], warnings=info["warnings"])
+            return info
+
+    with ThreadPoolExecutor(max_workers=len(platforms) or 1) as pool:
+        futures = {p: pool.submit(run, p) for p in platforms}
+        report: dict[str, object] = {}
+        for platform, future in futures.items():
+            try:
+                report[platform] = future.result()
+            except Exception as e:  # noqa: BLE001 - 单个平台失败不影响其他平台
+                report[platform] = {"error": f"{type(e).__name__}: {e}"}
+    write_atomic(article_dir / "conversion.json", json.dumps(report, ensure_ascii=False, indent=2))
+    return report
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="多平台转换后处理")
+    parser.add_argument("article_dir", type=Path)
+    parser.add_argument("--platforms", help="逗号分隔的目标平台，默认取 .pipeline.json 中的配置")
+    parser.add_argument("--source", default="humanized.md", help="共享的源稿")
+    args = parser.parse_args()
+
+    if args.platforms is not None:
+        platforms = [p for p in args.platforms.split(",") if p]
+    else:
+        platforms = load_manifest(args.article_dir)["config"].get("platforms", [])
+    if not platforms:
+        raise SystemExit("未指定目标平台：请传入 --platforms，或先用 pipeline.py plan 配置")
+    unknown = set(platforms) - set(FINALIZERS)
+    if unknown:
+        raise SystemExit(f"不支持的平台：{', '.join(sorted(unknown))}")
+    tracer = open_tracer(args.article_dir, "convert")
+    with tracer.span("convert", platforms=platforms):
+        report = convert(args.article_dir, platforms, args.source, tracer)
+    for platform, info in report.items():
+        print(f"{platform}：{json.dumps(info, ensure_ascii=False)}")
+    return 0 if all("error" not in info for info in report.values()) else 1  # type: ignore[operator]
+
+
+if __name__ == "__main__":
+    sys.exit(main())
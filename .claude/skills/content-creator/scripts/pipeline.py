@@ -0,0 +1,303 @@
+"""content-creator 的增量流水线：按文章目录记录每个阶段的输入、参数和输出。
+
+每篇文章目录下维护 ``.pipeline.json``，记录各阶段的参数哈希、上游输入指纹和输出文件指纹。
+再次运行时只重做受影响的阶段：
+
+- 从未完成、上次中断（只有开始没有结束）、输出文件缺失的阶段需要执行
+- 参数变化、上游阶段的输出变化时需要执行
+- 用户手动修改了某个阶段的输出（如编辑了 draft.md），该阶段本身不重做，下游全部重做
+- 新增目标平台时只执行对应的转换阶段
+
+由 LLM 完成的阶段（写作、人性化、平台转换）在 ``done`` 时把开始到结束的耗时和输出大小
+补记到文章目录的 ``trace.jsonl``，与各辅助脚本自己记录的 span 放在一起分析。
+
+用法：
+    python pipeline.py plan output/主题 --topic "主题" --platforms zhihu,xiaohongshu
+    python pipeline.py plan output/主题 --dry-run ...   # 只查看，不写入清单
+    python pipeline.py start output/主题 general-writing
+    python pipeline.py done output/主题 general-writing
+    python pipeline.py status output/主题
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "_shared"))
+
+from tracing import open_tracer  # noqa: E402
+
+MANIFEST = ".pipeline.json"
+
+
+@dataclass(frozen=True)
+class Stage:
+    name: str
+    deps: tuple[str, ...]
+    outputs: tuple[str, ...]
+    platform: str | None = None
+
+
+STAGES = (
+    Stage("deep-research", (), ("research*.md",)),
+    Stage("general-writing", ("deep-research",), ("draft.md",)),
+    Stage("image-search", ("general-writing",), ("images",)),
+    Stage("image-processing", ("image-search",), ("images",)),
+    Stage("humanizer-cn", ("general-writing", "image-processing"), ("humanized.md",)),
+    Stage("zhihu-converter", ("humanizer-cn",), ("zhihu.md",), platform="zhihu"),
+    Stage("xiaohongshu-converter", ("humanizer-cn",), ("xiaohongshu.md",), platform="xiaohongshu"),
+    Stage("wechat-converter", ("humanizer-cn",), ("wechat.md",), platform="wechat"),
+)
+STAGE_BY_NAME = {s.name: s for s in STAGES}
+# 可以按需跳过的阶段：不需要研究、不需要配图
+OPTIONAL = {"deep-research", "image-search", "image-processing"}
+
+
+def _sha256(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def fingerprint(article_dir: Path, patterns: tuple[str, ...]) -> str | None:
+    """输出文件的内容指纹；目录按其中所有文件计算，没有任何匹配文件时返回 None。"""
+    files: list[Path] = []
+    for pattern in patterns:
+        for path in sorted(article_dir.glob(pattern)):
+            files.extend(sorted(p for p in path.rglob("*") if p.is_file()) if path.is_dir() else [path])
+    if not files:
+        return None
+    h = hashlib.sha256()
+    for path in files:
+        h.update(path.relative_to(article_dir).as_posix().encode("utf-8"))
+        h.update(_sha256(path.read_bytes()).encode("ascii"))
+    return h.hexdigest()
+
+
+def output_bytes(article_dir: Path, patterns: tuple[str, ...]) -> int:
+    total = 0
+    for pattern in patterns:
+        for path in article_dir.glob(pattern):
+            files = path.rglob("*") if path.is_dir() else [path]
+            total += sum(p.stat().st_size for p in files if p.is_file())
+    return total
+
+
+def params_hash(params: dict[str, Any]) -> str:
+    return _sha256(json.dumps(params, sort_keys=True, ensure_ascii=False).encode("utf-8"))
+
+
+def load_manifest(article_dir: Path) -> dict[str, Any]:
+    path = article_dir / MANIFEST
+    if path.exists():
+        return json.loads(path.read_text(encoding="utf-8"))
+    return {"version": 1, "config": {}, "stages": {}}
+
+
+def save_manifest(article_dir: Path, manifest: dict[str, Any]) -> None:
+    # 只在真正写入时创建文章目录，plan --dry-run 和 status 不留下任何文件
+    article_dir.mkdir(parents=True, exist_ok=True)
+    path = article_dir / MANIFEST
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_text(json.dumps(manifest, ensure_ascii=False, indent=2), encoding="utf-8")
+    os.replace(tmp, path)
+
+
+class Pipeline:
+    def __init__(self, article_dir: Path, manifest: dict[str, Any] | None = None):
+        self.article_dir = article_dir
+        self.manifest = manifest if manifest is not None else load_manifest(article_dir)
+        self._fingerprints: dict[tuple[str, ...], str | None] = {}
+
+    @property
+    def config(self) -> dict[str, Any]:
+        return self.manifest["config"]
+
+    def active_stages(self) -> list[Stage]:
+        skip = set(self.config.get("skip", []))
+        platforms = set(self.config.get("platforms", []))
+        return [
+            s
+            for s in STAGES
+            if s.name not in skip and (s.platform is None or s.platform in platforms)
+        ]
+
+    def stage_params(self, stage: Stage) -> dict[str, Any]:
+        return {
+            "topic": self.config.get("topic"),
+            **self.config.get("params", {}).get(stage.name, {}),
+        }
+
+    def _current(self, stage: Stage) -> str | None:
+        key = stage.outputs
+        if key not in self._fingerprints:
+            self._fingerprints[key] = fingerprint(self.article_dir, key)
+        return self._fingerprints[key]
+
+    def _owner(self, stage: Stage) -> bool:
+        """同一输出由多个阶段原地修改时（如 images/），只有最后完成的阶段对当前内容负责。"""
+        records = self.manifest["stages"]
+        later = STAGES[STAGES.index(stage) + 1 :]
+        return not any(
+            s.outputs == stage.outputs and records.get(s.name, {}).get("status") == "done"
+            for s in later
+        )
+
+    def effective_output(self, stage: Stage) -> str | None:
+        """下游看到的输出指纹：用户改过的以当前文件为准，否则以记录为准。"""
+        record = self.manifest["stages"].get(stage.name)
+        if record is None or record.get("status") != "done":
+            return None
+        if self._owner(stage):
+            return self._current(stage)
+        return record["output"]
+
+    def input_hash(self, stage: Stage) -> str:
+        active = {s.name for s in self.active_stages()}
+        upstream = {
+            dep: self.effective_output(STAGE_BY_NAME[dep]) for dep in stage.deps if dep in active
+        }
+        return params_hash(upstream)
+
+    def plan(self) -> list[tuple[Stage, str | None]]:
+        """返回每个阶段及其需要执行的原因；``None`` 表示可以复用。"""
+        out: list[tuple[Stage, str | None]] = []
+        rerun: set[str] = set()
+        for stage in self.active_stages():
+            record = self.manifest["stages"].get(stage.name)
+            reason = None
+            if record is None:
+                reason = "尚未执行"
+            elif record.get("status") != "done":
+                reason = "上次执行被中断"
+            elif record["params"] != params_hash(self.stage_params(stage)):
+                reason = "参数已变化"
+            elif any(dep in rerun for dep in stage.deps):
+                reason = "上游阶段将重新执行"
+            elif record["input"] != self.input_hash(stage):
+                reason = "上游输出已变化"
+            elif self._current(stage) is None:
+                reason = "输出文件缺失"
+            if reason:
+                rerun.add(stage.name)
+            out.append((stage, reason))
+        return out
+
+    def start(self, name: str) -> None:
+        stage = STAGE_BY_NAME[name]
+        record = self.manifest["stages"].setdefault(name, {})
+        record.update(status="running", started_at=time.time(), outputs=list(stage.outputs))
+        save_manifest(self.article_dir, self.manifest)
+
+    def done(self, name: str) -> None:
+        stage = STAGE_BY_NAME[name]
+        self._fingerprints.clear()
+        output = self._current(stage)
+        if output is None:
+            raise FileNotFoundError(f"{name} 的输出不存在：{', '.join(stage.outputs)}")
+        record = self.manifest["stages"].setdefault(name, {})
+        record.update(
+            status="done",
+            params=params_hash(self.stage_params(stage)),
+            input=self.input_hash(stage),
+            output=output,
+            outputs=list(stage.outputs),
+            finished_at=time.time(),
+        )
+        save_manifest(self.article_dir, self.manifest)
+
+
+def _parse_params(items: list[str]) -> dict[str, dict[str, str]]:
+    params: dict[str, dict[str, str]] = {}
+    for item in items:
+        key, _, value = item.partition("=")
+        stage, _, name = key.partition(":")
+        if stage not in STAGE_BY_NAME or not name:
+            raise SystemExit(f"参数格式应为 阶段:名称=值，收到：{item}")
+        params.setdefault(stage, {})[name] = value
+    return params
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="content-creator 增量流水线")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_plan = sub.add_parser("plan", help="更新运行配置并列出需要执行的阶段")
+    p_plan.add_argument("article_dir", type=Path)
+    p_plan.add_argument("--topic")
+    p_plan.add_argument("--platforms", help="逗号分隔：zhihu,xiaohongshu,wechat")
+    p_plan.add_argument("--skip", help=f"逗号分隔的可跳过阶段：{','.join(sorted(OPTIONAL))}")
+    p_plan.add_argument("--param", action="append", default=[], metavar="阶段:名称=值")
+    p_plan.add_argument("--dry-run", action="store_true", help="只查看计划，不写入清单")
+    p_plan.add_argument("--json", action="store_true", help="以 JSON 输出计划")
+
+    for name, help_text in (("start", "标记阶段开始"), ("done", "记录阶段完成及其输出")):
+        p = sub.add_parser(name, help=help_text)
+        p.add_argument("article_dir", type=Path)
+        p.add_argument("stage", choices=[s.name for s in STAGES])
+
+    p_status = sub.add_parser("status", help="查看清单中各阶段的状态")
+    p_status.add_argument("article_dir", type=Path)
+
+    args = parser.parse_args()
+    pipeline = Pipeline(args.article_dir)
+
+    if args.command == "plan":
+        config = pipeline.config
+        if args.topic is not None:
+            config["topic"] = args.topic
+        if args.platforms is not None:
+            config["platforms"] = [p for p in args.platforms.split(",") if p]
+        if args.skip is not None:
+            skip = [s for s in args.skip.split(",") if s]
+            if not set(skip) <= OPTIONAL:
+                raise SystemExit(f"只能跳过：{', '.join(sorted(OPTIONAL))}")
+            config["skip"] = skip
+        for stage, values in _parse_params(args.param).items():
+            config.setdefault("params", {}).setdefault(stage, {}).update(values)
+
+        steps = pipeline.plan()
+        if not args.dry_run:
+            save_manifest(args.article_dir, pipeline.manifest)
+        if args.json:
+            print(json.dumps(
+                [{"stage": s.name, "run": r is not None, "reason": r} for s, r in steps],
+                ensure_ascii=False,
+            ))
+        else:
+            for stage, reason in steps:
+                print(f"{'执行' if reason else '复用'}  {stage.name}" + (f"（{reason}）" if reason else ""))
+    elif args.command == "start":
+        pipeline.start(args.stage)
+    elif args.command == "done":
+        # 只有经过 start 的阶段才有可信的开始时间
+        running = pipeline.manifest["stages"].get(args.stage, {}).get("status") == "running"
+        pipeline.done(args.stage)
+        record = pipeline.manifest["stages"][args.stage]
+        if running:
+            open_tracer(args.article_dir, "pipeline").record(
+                f"stage.{args.stage}",
+                record["started_at"],
+                (record["finished_at"] - record["started_at"]) * 1000,
+                bytes=output_bytes(args.article_dir, STAGE_BY_NAME[args.stage].outputs),
+            )
+    else:
+        for stage in STAGES:
+            record = pipeline.manifest["stages"].get(stage.name)
+            if record:
+                when = time.strftime(
+                    "%Y-%m-%d %H:%M",
+                    time.localtime(record.get("finished_at") or record["started_at"]),
+                )
+                print(f"{stage.name}：{record['status']}（{when}）")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
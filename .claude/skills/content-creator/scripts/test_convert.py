@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+import json
+import subprocess
+from pathlib import Path
+
+from conftest import run_script
+from convert import _IMAGE, _split_sources, convert, parse_article, restore_images
+
+SOURCE = """# 标题
+
+## 第一部分
+
+第一段。
+
+![图一](images/image_001.jpg)
+
+## 第二部分
+
+第二段。
+
+![图二](images/image_002.jpg)
+"""
+
+
+def _images(body: list[str]) -> list[str]:
+    return [path for _, path in _IMAGE.findall("\n".join(body))]
+
+
+def test_restore_images_puts_missing_images_back_into_their_sections():
+    article = parse_article(SOURCE)
+    body = ["# 标题", "", "## 第一部分", "", "改写后的第一段。", "", "## 第二部分", "", "改写后的第二段。"]
+
+    restored = restore_images(body, article)
+
+    assert _images(restored) == ["images/image_001.jpg", "images/image_002.jpg"]
+    assert restored.index("![图一](images/image_001.jpg)") < restored.index("## 第二部分")
+
+
+def test_restore_images_maps_renamed_headings_by_position():
+    article = parse_article(SOURCE)
+    body = ["# 标题", "", "## 换了个说法", "", "第一段。", "", "## 另一个说法", "", "第二段。"]
+
+    restored = restore_images(body, article)
+
+    assert restored.index("![图一](images/image_001.jpg)") < restored.index("## 另一个说法")
+    assert restored.index("![图二](images/image_002.jpg)") > restored.index("## 另一个说法")
+
+
+def test_restore_images_is_idempotent(article_dir):
+    article = parse_article((article_dir / "humanized.md").read_text(encoding="utf-8"))
+    body, _, _ = _split_sources((article_dir / "zhihu.md").read_text(encoding="utf-8").split("\n"))
+    assert _images(body) == []
+
+    once = restore_images(body, article)
+    assert sorted(_images(once)) == sorted(img.path for img in article.images)
+    assert restore_images(once, article) == once
+
+
+def test_convert_is_idempotent(article_dir):
+    convert(article_dir, ["zhihu", "xiaohongshu"])
+    first = (article_dir / "zhihu.md").read_text(encoding="utf-8")
+    convert(article_dir, ["zhihu", "xiaohongshu"])
+    assert (article_dir / "zhihu.md").read_text(encoding="utf-8") == first
+
+
+def test_missing_converter_output_is_an_error(article_dir):
+    report = convert(article_dir, ["zhihu", "wechat"])
+
+    assert "error" not in report["zhihu"]
+    assert "wechat.md" in report["wechat"]["error"]
+    assert not (article_dir / "wechat.md").exists()
+
+
+def _cli(article_dir: Path, *args: str) -> subprocess.CompletedProcess[str]:
+    return run_script("convert.py", str(article_dir), *args)
+
+
+def test_cli_takes_platforms_from_pipeline_config(article_dir):
+    assert _cli(article_dir).returncode != 0
+
+    manifest = {"version": 1, "config": {"platforms": ["xiaohongshu"]}, "stages": {}}
+    (article_dir / ".pipeline.json").write_text(json.dumps(manifest), encoding="utf-8")
+    result = _cli(article_dir)
+
+    assert result.returncode == 0
+    report = json.loads((article_dir / "conversion.json").read_text(encoding="utf-8"))
+    assert list(report) == ["xiaohongshu"]
+    assert _cli(article_dir, "--platforms", "zhihu,wechat").returncode == 1
@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+import json
+import subprocess
+from pathlib import Path
+
+from conftest import run_script
+from pipeline import MANIFEST, STAGE_BY_NAME, Pipeline, load_manifest
+
+
+def _configure(article_dir: Path, platforms: list[str]) -> Pipeline:
+    pipeline = Pipeline(article_dir)
+    pipeline.config.update(topic="酱油词汇演变", platforms=platforms)
+    return pipeline
+
+
+def _run_all(pipeline: Pipeline) -> None:
+    for stage, reason in pipeline.plan():
+        if reason:
+            pipeline.start(stage.name)
+            pipeline.done(stage.name)
+
+
+def _reasons(pipeline: Pipeline) -> dict[str, str | None]:
+    return {stage.name: reason for stage, reason in Pipeline(pipeline.article_dir).plan()}
+
+
+def _cli(*args: str) -> subprocess.CompletedProcess[str]:
+    return run_script("pipeline.py", *args, check=True)
+
+
+def test_completed_run_reuses_every_stage(article_dir):
+    pipeline = _configure(article_dir, ["zhihu", "xiaohongshu"])
+    assert all(reason == "尚未执行" for _, reason in pipeline.plan())
+    _run_all(pipeline)
+    assert set(_reasons(pipeline).values()) == {None}
+
+
+def test_last_stage_writing_images_owns_them(article_dir):
+    pipeline = _configure(article_dir, ["zhihu"])
+    _run_all(pipeline)
+    assert not pipeline._owner(STAGE_BY_NAME["image-search"])
+    assert pipeline._owner(STAGE_BY_NAME["image-processing"])
+
+    # image-processing 原地改写了 images/，image-search 不应因此被判定为输出变化
+    image = sorted((article_dir / "images").iterdir())[0]
+    image.write_bytes(image.read_bytes() + b"\0")
+    reasons = _reasons(pipeline)
+    assert reasons["image-search"] is None
+    assert reasons["image-processing"] is None
+    assert reasons["humanizer-cn"] == "上游输出已变化"
+    assert reasons["zhihu-converter"] == "上游阶段将重新执行"
+
+
+def test_hand_edited_output_reruns_only_downstream(article_dir):
+    pipeline = _configure(article_dir, ["zhihu", "xiaohongshu"])
+    _run_all(pipeline)
+    draft = article_dir / "draft.md"
+    draft.write_text(draft.read_text(encoding="utf-8") + "\n补充一段。\n", encoding="utf-8")
+
+    reasons = _reasons(pipeline)
+    assert reasons["deep-research"] is None
+    assert reasons["general-writing"] is None
+    assert reasons["image-search"] == "上游输出已变化"
+    assert reasons["image-processing"] == "上游阶段将重新执行"
+    assert reasons["humanizer-cn"] == "上游阶段将重新执行"
+    assert reasons["xiaohongshu-converter"] == "上游阶段将重新执行"
+
+
+def test_interrupted_stage_is_resumed(article_dir):
+    pipeline = _configure(article_dir, ["zhihu", "xiaohongshu"])
+    _run_all(pipeline)
+    pipeline.start("humanizer-cn")
+
+    reasons = _reasons(pipeline)
+    assert reasons["humanizer-cn"] == "上次执行被中断"
+    assert reasons["zhihu-converter"] == "上游阶段将重新执行"
+    assert reasons["xiaohongshu-converter"] == "上游阶段将重新执行"
+    assert reasons["image-processing"] is None
+
+
+def test_adding_a_platform_runs_only_its_converter(article_dir):
+    pipeline = _configure(article_dir, ["zhihu"])
+    _run_all(pipeline)
+    pipeline.config["platforms"] = ["zhihu", "xiaohongshu"]
+
+    to_run = {stage.name: reason for stage, reason in pipeline.plan() if reason}
+    assert to_run == {"xiaohongshu-converter": "尚未执行"}
+
+
+def test_dry_run_does_not_write_manifest(article_dir):
+    _cli("plan", str(article_dir), "--topic", "酱油词汇演变", "--platforms", "zhihu", "--dry-run")
+    assert not (article_dir / MANIFEST).exists()
+
+    _cli("plan", str(article_dir), "--topic", "酱油词汇演变", "--platforms", "zhihu")
+    saved = (article_dir / MANIFEST).read_text(encoding="utf-8")
+    out = _cli("plan", str(article_dir), "--platforms", "zhihu,wechat", "--dry-run", "--json")
+    steps = {step["stage"]: step["reason"] for step in json.loads(out.stdout)}
+    assert steps["wechat-converter"] == "尚未执行"
+    assert (article_dir / MANIFEST).read_text(encoding="utf-8") == saved
+    assert load_manifest(article_dir)["config"]["platforms"] == ["zhihu"]
+
+
+def test_read_only_commands_do_not_create_the_article_dir(tmp_path):
+    article_dir = tmp_path / "新主题"
+    _cli("plan", str(article_dir), "--topic", "新主题", "--platforms", "zhihu", "--dry-run")
+    _cli("status", str(article_dir))
+    assert not article_dir.exists()
+
+    _cli("plan", str(article_dir), "--topic", "新主题", "--platforms", "zhihu")
+    assert (article_dir / MANIFEST).exists()
@@ -0,0 +1,93 @@
+"""结果过滤基准测试：在示例研究报告上统计节省的 token，并测 10k 结果的去重吞吐。
+
+用法：
+    python bench_filter.py --examples ../../../../examples --scale 10000
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import re
+import time
+from dataclasses import replace
+from pathlib import Path
+
+from research import parse_report, render_report
+from result_filter import NearDuplicateIndex, filter_results
+from search_engine import SearchResult, expand_keywords
+
+_CJK_CHAR = re.compile(r"[㐀-鿿豈-﫿]")
+_WORD = re.compile(r"[A-Za-z0-9]+")
+
+
+def estimate_tokens(text: str) -> int:
+    """粗略估算 token 数：中文每字约 1 个，英文单词约 1.3 个，标点按 1/2 计。"""
+    cjk = len(_CJK_CHAR.findall(text))
+    words = len(_WORD.findall(text))
+    rest = len(text) - cjk - sum(len(w) for w in _WORD.findall(text)) - text.count(" ")
+    return int(cjk + words * 1.3 + max(rest, 0) / 2)
+
+
+def bench_examples(examples: Path) -> None:
+    print("示例报告：")
+    for path in sorted(examples.glob("*/research*.md")):
+        topic, results = parse_report(path.read_text(encoding="utf-8"))
+        keywords = expand_keywords(topic)
+        before = estimate_tokens(render_report(topic, keywords, results))
+        filtered = filter_results(results, topic)
+        after = estimate_tokens(render_report(topic, keywords, filtered.kept))
+        print(
+            f"  {path.parent.name}/{path.name}：{len(results)} → {len(filtered.kept)} 条"
+            f"（{filtered.summary()}），约 {before} → {after} token，节省 {1 - after / before:.0%}"
+        )
+
+
+def synthesize(examples: Path, n: int, seed: int = 0) -> tuple[str, list[SearchResult]]:
+    """用示例结果扩充出 n 条：随机删字模拟转载和截断，打乱字序模拟不同文章。"""
+    rng = random.Random(seed)
+    topic, base = parse_report(next(iter(sorted(examples.glob("*/research.md")))).read_text("utf-8"))
+    out = []
+    for i in range(n):
+        src = rng.choice(base)
+        if rng.random() < 0.5:
+            title = "".join(c for c in src.title if rng.random() > 0.05)
+            snippet = "".join(c for c in src.snippet if rng.random() > 0.05)
+        else:
+            title = "".join(rng.sample(src.title, len(src.title)))
+            snippet = "".join(rng.sample(src.snippet, len(src.snippet)))
+        out.append(replace(src, title=title, snippet=snippet, url=f"{src.url}?v={i}"))
+    return topic, out
+
+
+def bench_throughput(examples: Path, n: int) -> None:
+    topic, results = synthesize(examples, n)
+
+    index = NearDuplicateIndex()
+    start = time.perf_counter()
+    duplicates = sum(index.add(r.title, r.snippet) is not None for r in results)
+    elapsed = time.perf_counter() - start
+    print(
+        f"去重吞吐：{n} 条耗时 {elapsed:.2f}s（{n / elapsed:.0f} 条/秒），"
+        f"近似重复 {duplicates} 条，索引 {len(index)} 条"
+    )
+
+    start = time.perf_counter()
+    filtered = filter_results(results, topic)
+    elapsed = time.perf_counter() - start
+    print(f"完整过滤：{n} 条耗时 {elapsed:.2f}s（{n / elapsed:.0f} 条/秒），{filtered.summary()}")
+
+
+def main() -> None:
+    default_examples = Path(__file__).resolve().parents[4] / "examples"
+    parser = argparse.ArgumentParser(description="研究结果过滤基准测试")
+    parser.add_argument("--examples", type=Path, default=default_examples, help="示例目录")
+    parser.add_argument("--scale", type=int, default=10000, help="吞吐测试的结果条数")
+    args = parser.parse_args()
+
+    bench_examples(args.examples)
+    bench_throughput(args.examples, args.scale)
+
+
+if __name__ == "__main__":
+    main()
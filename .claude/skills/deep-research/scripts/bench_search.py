@@ -0,0 +1,89 @@
+"""并发搜索的离线基准测试：用本地假 DDGS 后端模拟网络延迟和限流。
+
+用法：
+    python bench_search.py --keywords 5 20 50
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import threading
+import time
+from typing import Any
+
+from search_engine import DEFAULT_BACKENDS, ConcurrentSearcher, Throttled
+
+
+class FakeBackend:
+    """模拟 DDGS 的本地搜索函数：固定延迟 + 一定概率限流。"""
+
+    def __init__(self, latency: float = 0.2, throttle_rate: float = 0.1, seed: int = 0):
+        self.latency = latency
+        self.throttle_rate = throttle_rate
+        self.calls = 0
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def __call__(
+        self,
+        query: str,
+        backend: str,
+        region: str,
+        timelimit: str | None,
+        max_results: int,
+    ) -> list[dict[str, Any]]:
+        with self._lock:
+            self.calls += 1
+            throttled = self._rng.random() < self.throttle_rate
+        time.sleep(self.latency)
+        if throttled:
+            raise Throttled(f"{backend} 429")
+        return self.results(query, backend, max_results)
+
+    def results(self, query: str, backend: str, max_results: int) -> list[dict[str, Any]]:
+        """返回的结果；子类可以改为回放录制的数据。"""
+        return [
+            {
+                "title": f"{query} - {backend} #{i}",
+                "href": f"https://{backend}.example/{abs(hash(query)) % 10**8}/{i}",
+                "body": f"{query} 的第 {i} 条摘要",
+            }
+            for i in range(max_results)
+        ]
+
+
+def run_once(n_keywords: int, backends: list[str], workers: int, latency: float) -> None:
+    keywords = [f"关键词{i}" for i in range(n_keywords)]
+    fake = FakeBackend(latency=latency)
+    searcher = ConcurrentSearcher(
+        search_fn=fake,
+        max_workers=workers,
+        backend_interval=0.0,
+        retry_base_delay=0.05,
+        deadline=60.0,
+    )
+    report = searcher.run(keywords, backends)
+    serial = fake.calls * latency
+    print(
+        f"{n_keywords:>3} 关键词 × {len(backends)} 后端：{report.completed}/{report.total} 完成，"
+        f"{len(report.results)} 条结果，重试 {report.retries} 次，"
+        f"耗时 {report.elapsed:.2f}s（串行约 {serial:.2f}s，加速 {serial / report.elapsed:.1f}x）"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="并发搜索离线基准测试")
+    parser.add_argument("--keywords", type=int, nargs="+", default=[5, 20, 50])
+    parser.add_argument("--backends", default=",".join(DEFAULT_BACKENDS))
+    parser.add_argument("--workers", type=int, default=16)
+    parser.add_argument("--latency", type=float, default=0.2, help="假后端单次请求延迟（秒）")
+    args = parser.parse_args()
+
+    backends = args.backends.split(",")
+    for n in args.keywords:
+        run_once(n, backends, args.workers, args.latency)
+
+
+if __name__ == "__main__":
+    main()
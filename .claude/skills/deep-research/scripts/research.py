@@ -0,0 +1,204 @@
+"""deep-research 的 DDGS 回退搜索：并发搜索并生成 research.md。
+
+用法：
+    python research.py "研究主题" -o output/主题/research.md
+"""
+
+from __future__ import annotations
+
+import argparse
+import re
+import sys
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "_shared"))
+
+from result_filter import filter_results  # noqa: E402
+from search_cache import DEFAULT_PATH, SearchCache  # noqa: E402
+from search_engine import (  # noqa: E402
+    DEFAULT_BACKENDS,
+    ConcurrentSearcher,
+    SearchReport,
+    SearchResult,
+    expand_keywords,
+    text_backends,
+)
+from tracing import Tracer, open_tracer  # noqa: E402
+
+
+def dedupe(results: list[SearchResult]) -> list[SearchResult]:
+    """按 URL 去重，保留首次出现的结果。"""
+    seen: set[str] = set()
+    unique = []
+    for r in results:
+        key = r.url.rstrip("/")
+        if not r.url or key in seen:
+            continue
+        seen.add(key)
+        unique.append(r)
+    return unique
+
+
+_FINDING = re.compile(r"^### \d+\. (.*)$", re.M)
+_SOURCE = re.compile(r"^> 来源：\[.*\]\((.*)\)$", re.M)
+
+
+def parse_report(text: str) -> tuple[str, list[SearchResult]]:
+    """从已有的 research.md 中解析出研究主题和结果列表。"""
+    text = text.replace("\r\n", "\n")
+    topic = text.split("\n", 1)[0].removeprefix("# 研究报告：").strip()
+    body = text.split("## 核心发现", 1)[-1].split("\n---\n", 1)[0]
+    results = []
+    for block in re.split(r"\n(?=### \d+\. )", body):
+        title = _FINDING.search(block)
+        if title is None:
+            continue
+        source = _SOURCE.search(block)
+        snippet = "\n".join(
+            line
+            for line in block.split("\n")[1:]
+            if line.strip() and not line.startswith("> 来源：")
+        )
+        results.append(
+            SearchResult(
+                title=title.group(1).strip(),
+                url=source.group(1) if source else "",
+                snippet=snippet.strip(),
+                query=topic,
+                backend="",
+            )
+        )
+    return topic, results
+
+
+def render_report(
+    topic: str,
+    keywords: list[str],
+    results: list[SearchResult],
+    cache_summary: str | None = None,
+    filter_summary: str | None = None,
+) -> str:
+    """按 deep-research 报告格式渲染 Markdown。"""
+    lines = [
+        f"# 研究报告：{topic}",
+        "",
+        "## 搜索概览",
+        f"- 搜索时间：{datetime.now():%Y-%m-%d %H:%M}",
+        f"- 关键词：{', '.join(keywords)}",
+        f"- 结果数量：{len(results)} 条（已去重）",
+    ]
+    if filter_summary:
+        lines.append(f"- 过滤：{filter_summary}")
+    if cache_summary:
+        lines.append(f"- 缓存：{cache_summary}")
+    lines += ["", "## 核心发现", ""]
+    for i, r in enumerate(results, 1):
+        lines += [f"### {i}. {r.title}", "", r.snippet, "", f"> 来源：[{r.title}]({r.url})", ""]
+    lines += ["---", "", "## 参考资料", ""]
+    lines += [f"{i}. [{r.title}]({r.url})" for i, r in enumerate(results, 1)]
+    return "\n".join(lines) + "\n"
+
+
+def research(
+    topic: str,
+    output: Path,
+    searcher: ConcurrentSearcher,
+    backends: list[str],
+    min_relevance: float = 0.1,
+    tracer: Tracer | None = None,
+) -> tuple[SearchReport, list[SearchResult]]:
+    """搜索、过滤并写出 research.md；传入 ``tracer`` 时记录各步骤的 span。"""
+    tracer = tracer or Tracer(None)
+    cache = searcher.cache
+    keywords = expand_keywords(topic)
+    with tracer.span("deep-research.search", keywords=len(keywords)) as span:
+        stats = cache.stats if cache else None
+        before = (stats.hits + stats.stale_hits, stats.misses) if stats else (0, 0)
+        report = searcher.run(keywords, backends)
+        span.set(
+            results=len(report.results),
+            retries=report.retries,
+            errors=len(report.errors),
+            timed_out=report.timed_out,
+        )
+        if stats:
+            span.set(
+                cache_hits=stats.hits + stats.stale_hits - before[0],
+                cache_misses=stats.misses - before[1],
+            )
+    with tracer.span("deep-research.filter", results=len(report.results)) as span:
+        filtered = filter_results(dedupe(report.results), topic, min_relevance)
+        span.set(kept=len(filtered.kept))
+
+    cache_summary = cache.stats.summary() if cache else None
+    text = render_report(topic, keywords, filtered.kept, cache_summary, filtered.summary())
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(text, encoding="utf-8")
+    return report, filtered.kept
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="DDGS 并发深度研究")
+    parser.add_argument("topic", help="研究主题")
+    parser.add_argument("-o", "--output", type=Path, required=True, help="research.md 输出路径")
+    parser.add_argument("--backends", default=",".join(DEFAULT_BACKENDS), help="逗号分隔的搜索后端")
+    parser.add_argument("--region", default="cn-zh")
+    parser.add_argument("--timelimit", default=None, help="时间范围：d / w / m / y")
+    parser.add_argument("--max-results", type=int, default=10, help="每个关键词每个后端的结果数")
+    parser.add_argument("--workers", type=int, default=8, help="最大并发数")
+    parser.add_argument("--deadline", type=float, default=30.0, help="全局截止时间（秒）")
+    parser.add_argument(
+        "--min-relevance", type=float, default=0.1, help="低于该相关性得分的结果直接丢弃"
+    )
+    parser.add_argument("--cache", type=Path, default=DEFAULT_PATH, help="搜索缓存数据库路径")
+    parser.add_argument("--no-cache", action="store_true", help="不读写搜索缓存")
+    parser.add_argument(
+        "--stale-while-revalidate",
+        type=float,
+        default=0.0,
+        metavar="SECONDS",
+        help="过期后仍可先返回旧结果的宽限时间，后台刷新",
+    )
+    args = parser.parse_args()
+
+    cache = None
+    if not args.no_cache:
+        cache = SearchCache(args.cache, stale_while_revalidate=args.stale_while_revalidate)
+
+    tracer = open_tracer(args.output.parent, "deep-research")
+    searcher = ConcurrentSearcher(
+        max_workers=args.workers,
+        deadline=args.deadline,
+        region=args.region,
+        timelimit=args.timelimit,
+        max_results=args.max_results,
+        cache=cache,
+        tracer=tracer,
+    )
+    backends = [b.strip() for b in args.backends.split(",") if b.strip()]
+    unknown = set(backends) - text_backends()
+    if unknown:
+        raise SystemExit(
+            f"ddgs 不支持的搜索后端：{', '.join(sorted(unknown))}"
+            f"（可用：{', '.join(sorted(text_backends()))}）"
+        )
+    report, results = research(
+        args.topic, args.output, searcher, backends, args.min_relevance, tracer
+    )
+    if cache:
+        cache.close()
+
+    print(
+        f"完成 {report.completed}/{report.total} 个搜索，{len(results)} 条结果，"
+        f"重试 {report.retries} 次，耗时 {report.elapsed:.1f}s"
+        + ("（已到截止时间，返回部分结果）" if report.timed_out else ""),
+        file=sys.stderr,
+    )
+    for task, err in report.errors.items():
+        print(f"  失败：{task.query} @ {task.backend}：{err}", file=sys.stderr)
+    return 0 if results else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,193 @@
+"""研究结果的近似去重与无关结果过滤。
+
+- 归一化：去掉搜索引擎在中文字符之间插入的空格、站点后缀（「_腾讯新闻」「- 36氪」等）
+- 分片：中文按字二元组，其他文字按单词，兼顾中英混排
+- 近似去重：单置换 MinHash（每个分片只哈希一次）+ LSH 分桶生成候选，
+  再用精确 Jaccard / 包含度确认，流式处理，结果按到达顺序保留首条
+- 相关性：主题各词中在标题或摘要里出现过的比例，过低或只有域名的结果直接丢弃
+"""
+
+from __future__ import annotations
+
+import re
+import zlib
+from dataclasses import dataclass, field
+from typing import Iterable
+from urllib.parse import urlsplit
+
+from search_engine import SearchResult
+
+_CJK = r"㐀-鿿豈-﫿"
+_CJK_GAP = re.compile(rf"(?<=[{_CJK}])\s+(?=[{_CJK}])")
+_NON_WORD = re.compile(rf"[^0-9a-z{_CJK}]+")
+_HAS_CJK = re.compile(rf"[{_CJK}]")
+# 标题末尾的站点名：「xxx_腾讯新闻」「xxx - 36氪」「xxx | 爱范儿」
+_SITE_SUFFIX = re.compile(r"\s*(?:[_|｜]| [-–—] |-(?=[^-]*$))[^_|｜]{1,30}$")
+_BARE_DOMAIN = re.compile(r"^[\w-]+(\.[\w-]+)+(/\S*)?$")
+
+NUM_BINS = 32
+ROWS_PER_BAND = 2
+
+
+def normalize(text: str) -> str:
+    text = _CJK_GAP.sub("", text.lower())
+    return _NON_WORD.sub(" ", text).strip()
+
+
+def strip_site_suffix(title: str) -> str:
+    title = title.rstrip(". …")
+    stripped = _SITE_SUFFIX.sub("", title)
+    return stripped if len(stripped) >= 4 else title
+
+
+def shingles(text: str) -> set[str]:
+    """中文取字二元组，其他取单词。"""
+    out: set[str] = set()
+    for token in normalize(text).split():
+        if _HAS_CJK.search(token) and len(token) > 1:
+            out.update(token[i : i + 2] for i in range(len(token) - 1))
+        else:
+            out.add(token)
+    return out
+
+
+def minhash(features: set[str]) -> tuple[int, ...]:
+    """单置换 MinHash：按哈希值分桶取最小值，空桶向后借值（densification）。"""
+    mins: list[int | None] = [None] * NUM_BINS
+    for f in features:
+        h = zlib.crc32(f.encode("utf-8"))
+        b, v = h % NUM_BINS, h // NUM_BINS
+        if mins[b] is None or v < mins[b]:
+            mins[b] = v
+    if all(m is None for m in mins):
+        return ()
+    filled = list(mins)
+    for i in range(NUM_BINS):
+        j = i
+        while filled[i] is None:
+            j = (j + 1) % NUM_BINS
+            if mins[j] is not None:
+                filled[i] = mins[j] + (j - i) % NUM_BINS * 2**27
+    return tuple(filled)  # type: ignore[arg-type]
+
+
+def jaccard(a: set[str], b: set[str]) -> float:
+    return len(a & b) / len(a | b) if a and b else 0.0
+
+
+def containment(a: set[str], b: set[str]) -> float:
+    return len(a & b) / min(len(a), len(b)) if a and b else 0.0
+
+
+@dataclass
+class _Entry:
+    title: set[str]
+    full: set[str]
+
+
+class NearDuplicateIndex:
+    """流式近似去重索引：``add`` 返回与之重复的已有条目编号，否则收录并返回 None。"""
+
+    def __init__(
+        self,
+        title_threshold: float = 0.6,
+        title_containment: float = 0.8,
+        full_threshold: float = 0.6,
+    ):
+        self.title_threshold = title_threshold
+        self.title_containment = title_containment
+        self.full_threshold = full_threshold
+        self._entries: list[_Entry] = []
+        self._buckets: dict[tuple[int, int, tuple[int, ...]], list[int]] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def add(self, title: str, snippet: str) -> int | None:
+        title_sh = shingles(strip_site_suffix(title))
+        full_sh = title_sh | shingles(snippet)
+        keys = self._band_keys(0, title_sh) + self._band_keys(1, full_sh)
+
+        candidates: set[int] = set()
+        for key in keys:
+            candidates.update(self._buckets.get(key, ()))
+        for idx in sorted(candidates):
+            if self._is_duplicate(self._entries[idx], title_sh, full_sh):
+                return idx
+
+        idx = len(self._entries)
+        self._entries.append(_Entry(title_sh, full_sh))
+        for key in keys:
+            self._buckets.setdefault(key, []).append(idx)
+        return None
+
+    def _band_keys(self, kind: int, features: set[str]) -> list[tuple[int, int, tuple[int, ...]]]:
+        sig = minhash(features)
+        return [
+            (kind, band, sig[band * ROWS_PER_BAND : (band + 1) * ROWS_PER_BAND])
+            for band in range(len(sig) // ROWS_PER_BAND)
+        ]
+
+    def _is_duplicate(self, entry: _Entry, title_sh: set[str], full_sh: set[str]) -> bool:
+        if jaccard(entry.title, title_sh) >= self.title_threshold:
+            return True
+        # 截断标题（「...」结尾）只比较包含度，短标题容易误判所以要求足够长
+        if (
+            min(len(entry.title), len(title_sh)) >= 6
+            and containment(entry.title, title_sh) >= self.title_containment
+        ):
+            return True
+        return jaccard(entry.full, full_sh) >= self.full_threshold
+
+
+def relevance(result: SearchResult, topic_terms: list[set[str]]) -> float:
+    """主题各词中至少有一个分片出现在标题或摘要里的比例。
+
+    不按每个词的覆盖率取平均：主题词一多，只谈其中一两个方面的结果
+    （例如只讲酱园、只讲淋锅边）平均下来也会低于阈值。
+    """
+    if not topic_terms:
+        return 1.0
+    doc = shingles(f"{result.title} {result.snippet}")
+    return sum(not term.isdisjoint(doc) for term in topic_terms) / len(topic_terms)
+
+
+def is_junk(result: SearchResult) -> bool:
+    """只有域名 / URL 做标题，或者落在站点首页的结果。"""
+    if not result.title or _BARE_DOMAIN.match(result.title.strip()):
+        return True
+    # 只靠查询参数定位的文章（如 WordPress 的 /?p=123）不是首页
+    url = urlsplit(result.url)
+    return url.path.strip("/") == "" and not url.query
+
+
+@dataclass
+class FilterReport:
+    kept: list[SearchResult] = field(default_factory=list)
+    merged: int = 0
+    dropped: int = 0
+
+    def summary(self) -> str:
+        """渲染成研究报告「搜索概览」中的一行。"""
+        return f"合并近似重复 {self.merged} 条，剔除无关结果 {self.dropped} 条"
+
+
+def filter_results(
+    results: Iterable[SearchResult],
+    topic: str,
+    min_relevance: float = 0.1,
+    index: NearDuplicateIndex | None = None,
+) -> FilterReport:
+    """流式过滤：先剔除无关结果，再做近似去重。"""
+    topic_terms = [sh for sh in map(shingles, topic.split()) if sh]
+    if index is None:
+        index = NearDuplicateIndex()
+    report = FilterReport()
+    for r in results:
+        if is_junk(r) or relevance(r, topic_terms) < min_relevance:
+            report.dropped += 1
+        elif index.add(r.title, r.snippet) is not None:
+            report.merged += 1
+        else:
+            report.kept.append(r)
+    return report
@@ -0,0 +1,284 @@
+"""并发多关键词 DDGS 搜索引擎。
+
+把「关键词 × 后端」的所有组合一次性扇出到线程池中执行：
+
+- 每个后端独立限速（两次请求之间的最小间隔）
+- 遇到限流 / 超时时按指数退避 + 随机抖动重试
+- 全局截止时间：到点后立即返回已完成的部分结果
+
+搜索函数可注入，离线基准测试时用本地假后端替换 ``ddgs``；传入
+``SearchCache`` 时命中缓存的任务不占用后端配额；传入 ``Tracer`` 时每个任务记录一个
+span（耗时、是否命中缓存、重试次数）。
+"""
+
+from __future__ import annotations
+
+import random
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from contextlib import nullcontext
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any, Callable, Iterable
+
+if TYPE_CHECKING:
+    from search_cache import SearchCache
+    from tracing import Tracer
+
+# 默认扇出的文本搜索后端，必须是 ddgs 文本搜索支持的引擎名（见 text_backends()）
+DEFAULT_BACKENDS = ("duckduckgo", "brave", "yahoo")
+
+
+class Throttled(Exception):
+    """后端限流或超时，可以重试。"""
+
+
+@dataclass(frozen=True)
+class SearchTask:
+    """一次搜索请求：单个关键词在单个后端上的查询。"""
+
+    query: str
+    backend: str
+
+
+@dataclass
+class SearchResult:
+    """归一化后的单条搜索结果。"""
+
+    title: str
+    url: str
+    snippet: str
+    query: str
+    backend: str
+
+
+@dataclass
+class SearchReport:
+    """一次并发搜索的汇总结果。"""
+
+    results: list[SearchResult] = field(default_factory=list)
+    errors: dict[SearchTask, str] = field(default_factory=dict)
+    retries: int = 0
+    completed: int = 0
+    total: int = 0
+    timed_out: bool = False
+    elapsed: float = 0.0
+
+
+# 搜索函数签名：(query, backend, region, timelimit, max_results) -> 原始结果列表
+SearchFn = Callable[[str, str, str, "str | None", int], "list[dict[str, Any]]"]
+
+
+def ddgs_search(
+    query: str,
+    backend: str,
+    region: str,
+    timelimit: str | None,
+    max_results: int,
+) -> list[dict[str, Any]]:
+    """调用 ddgs 文本搜索，把限流 / 超时异常统一转换为 :class:`Throttled`。"""
+    from ddgs import DDGS
+    from ddgs.exceptions import RatelimitException, TimeoutException
+
+    try:
+        return DDGS().text(
+            query,
+            backend=backend,
+            region=region,
+            timelimit=timelimit,
+            max_results=max_results,
+        )
+    except (RatelimitException, TimeoutException) as e:
+        raise Throttled(str(e)) from e
+
+
+def text_backends() -> set[str]:
+    """已安装的 ddgs 支持的文本搜索引擎。
+
+    ddgs 遇到不认识的引擎名只记一条警告并换用其他引擎，
+    这时按后端限速和缓存键都对不上实际请求的引擎，需要事先校验。
+    """
+    from ddgs.engines import ENGINES
+
+    return set(ENGINES["text"])
+
+
+def expand_keywords(topic: str) -> list[str]:
+    """把研究主题扩展为多个关键词变体。"""
+    return [topic] + [f"{topic} {suffix}" for suffix in ("最新", "教程", "评测", "是什么")]
+
+
+class RateLimiter:
+    """按后端限速：同一后端两次请求之间至少间隔 ``interval`` 秒。"""
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._next_slot: dict[str, float] = {}
+
+    def acquire(self, backend: str, deadline: float) -> bool:
+        """预约下一个可用时间片并等待；若等不到截止时间之前则返回 False。"""
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot.get(backend, now))
+            if slot > deadline:
+                return False
+            self._next_slot[backend] = slot + self.interval
+        delay = slot - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+        return True
+
+
+class ConcurrentSearcher:
+    """有界并发的多关键词、多后端搜索执行器。"""
+
+    def __init__(
+        self,
+        search_fn: SearchFn = ddgs_search,
+        max_workers: int = 8,
+        backend_interval: float = 1.0,
+        max_retries: int = 3,
+        retry_base_delay: float = 1.0,
+        deadline: float = 30.0,
+        region: str = "cn-zh",
+        timelimit: str | None = None,
+        max_results: int = 10,
+        cache: SearchCache | None = None,
+        tracer: Tracer | None = None,
+    ):
+        self.search_fn = search_fn
+        self.max_workers = max_workers
+        self.limiter = RateLimiter(backend_interval)
+        self.max_retries = max_retries
+        self.retry_base_delay = retry_base_delay
+        self.deadline = deadline
+        self.region = region
+        self.timelimit = timelimit
+        self.max_results = max_results
+        self.cache = cache
+        self.tracer = tracer
+
+    def run(
+        self,
+        keywords: Iterable[str],
+        backends: Iterable[str] = DEFAULT_BACKENDS,
+    ) -> SearchReport:
+        """并发执行所有搜索任务，结果按（关键词, 后端, 排名）的原始顺序返回。"""
+        backends = list(backends)
+        tasks = [SearchTask(q, b) for q in keywords for b in backends]
+        report = SearchReport(total=len(tasks))
+        start = time.monotonic()
+        deadline = start + self.deadline
+        retry_counter = [0]
+        retry_lock = threading.Lock()
+        parent = self.tracer.current() if self.tracer else None
+
+        def count_retry() -> None:
+            with retry_lock:
+                retry_counter[0] += 1
+
+        by_task: dict[SearchTask, list[SearchResult]] = {}
+        pool = ThreadPoolExecutor(max_workers=self.max_workers)
+        try:
+            futures: dict[Future, SearchTask] = {
+                pool.submit(self._run_task, task, deadline, count_retry, parent): task
+                for task in tasks
+            }
+            pending = set(futures)
+            while pending:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    report.timed_out = True
+                    break
+                done, pending = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+                for future in done:
+                    task = futures[future]
+                    try:
+                        by_task[task] = future.result()
+                        report.completed += 1
+                    except Exception as e:  # noqa: BLE001 - 单个任务失败不影响整体
+                        report.errors[task] = f"{type(e).__name__}: {e}"
+        finally:
+            # 截止时间到达后不等待仍在运行的请求
+            pool.shutdown(wait=False, cancel_futures=True)
+
+        for task in tasks:
+            report.results.extend(by_task.get(task, []))
+        report.retries = retry_counter[0]
+        report.elapsed = time.monotonic() - start
+        return report
+
+    def _run_task(
+        self,
+        task: SearchTask,
+        deadline: float,
+        on_retry: Callable[[], None],
+        parent: str | None = None,
+    ) -> list[SearchResult]:
+        retries = [0]
+
+        def retry() -> None:
+            retries[0] += 1
+            on_retry()
+
+        def fetch() -> list[dict[str, Any]]:
+            return self._fetch(task, deadline, retry)
+
+        span_cm = (
+            self.tracer.span("search.query", parent, query=task.query, backend=task.backend)
+            if self.tracer
+            else nullcontext()
+        )
+        with span_cm as span:
+            if self.cache is None:
+                raw, status = fetch(), "miss"
+            else:
+                raw, status = self.cache.lookup(
+                    "text",
+                    task.query,
+                    task.backend,
+                    self.region,
+                    self.timelimit,
+                    self.max_results,
+                    fetch,
+                )
+            if span is not None:
+                # 过期复用时 fetch 在后台刷新线程里执行，命中与否和重试次数都只看本次查找
+                hit = status != "miss"
+                span.set(results=len(raw), cache_hits=int(hit), retries=0 if hit else retries[0])
+        return [_normalize(item, task) for item in raw]
+
+    def _fetch(
+        self,
+        task: SearchTask,
+        deadline: float,
+        on_retry: Callable[[], None],
+    ) -> list[dict[str, Any]]:
+        for attempt in range(self.max_retries + 1):
+            if not self.limiter.acquire(task.backend, deadline):
+                raise TimeoutError("超过全局截止时间")
+            try:
+                return self.search_fn(
+                    task.query, task.backend, self.region, self.timelimit, self.max_results
+                )
+            except Throttled:
+                if attempt == self.max_retries:
+                    raise
+                # 指数退避 + 全抖动
+                delay = random.uniform(0, self.retry_base_delay * 2**attempt)
+                if time.monotonic() + delay > deadline:
+                    raise
+                on_retry()
+                time.sleep(delay)
+        raise AssertionError("unreachable")
+
+
+def _normalize(item: dict[str, Any], task: SearchTask) -> SearchResult:
+    return SearchResult(
+        title=(item.get("title") or "").strip(),
+        url=(item.get("href") or item.get("url") or "").strip(),
+        snippet=(item.get("body") or item.get("snippet") or "").strip(),
+        query=task.query,
+        backend=task.backend,
+    )
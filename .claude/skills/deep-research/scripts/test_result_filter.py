@@ -0,0 +1,54 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+from research import parse_report
+from result_filter import NearDuplicateIndex, filter_results, is_junk
+from search_engine import SearchResult
+
+EXAMPLES = Path(__file__).resolve().parents[4] / "examples"
+
+
+def _supplement():
+    path = EXAMPLES / "酱油词汇演变" / "research_supplement.md"
+    return parse_report(path.read_text(encoding="utf-8"))
+
+
+def test_long_topic_keeps_results_about_one_aspect():
+    topic, results = _supplement()
+    kept = {r.title for r in filter_results(results, topic).kept}
+    for title in (
+        '蹲点小记｜"酱"四代用老缸酿新味儿 — 新京报',
+        '酱缸里的非遗!盐城"何老大"女当家的守新之道 - 盐城新闻网',
+        "酱油为什么要淋锅边 - 抖音",
+    ):
+        assert title in kept
+
+
+def test_off_topic_results_are_dropped():
+    topic, results = _supplement()
+    report = filter_results(results, topic)
+    kept = {r.title for r in report.kept}
+    assert "抖音400... | 911爆料网" not in kept
+    assert "厦门美食之旅：探索4大籍贯 菜 与美景 | TikTok" not in kept
+    assert report.dropped >= 2
+
+
+def test_empty_index_is_shared_between_calls():
+    topic, results = _supplement()
+    index = NearDuplicateIndex()
+    first = filter_results(results, topic, index=index)
+    assert len(index) == len(first.kept)
+    second = filter_results(results, topic, index=index)
+    assert second.kept == []
+    assert second.merged == len(first.kept) + first.merged
+
+
+def test_homepages_are_junk_but_query_addressed_articles_are_not():
+    def result(url: str) -> SearchResult:
+        return SearchResult("酱油的历史", url, "摘要", "酱油", "duckduckgo")
+
+    assert is_junk(result("https://blog.example/"))
+    assert is_junk(result("https://blog.example"))
+    assert not is_junk(result("https://blog.example/?p=123"))
+    assert not is_junk(result("https://blog.example/2024/soy-sauce"))
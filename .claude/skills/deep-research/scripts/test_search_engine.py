@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+import sys
+import threading
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import Any
+
+from bench_search import FakeBackend
+from search_engine import DEFAULT_BACKENDS, ConcurrentSearcher, RateLimiter, text_backends
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "_shared"))
+
+from search_cache import SearchCache  # noqa: E402
+from tracing import Tracer, load  # noqa: E402
+
+
+class RecordingBackend(FakeBackend):
+    """记录每个后端收到请求的时间，``slow`` 中的后端一直拖到超时。"""
+
+    def __init__(self, slow: tuple[str, ...] = (), **kwargs: Any):
+        super().__init__(**kwargs)
+        self.slow = slow
+        self.times: dict[str, list[float]] = defaultdict(list)
+        self._times_lock = threading.Lock()
+
+    def results(self, query: str, backend: str, max_results: int) -> list[dict[str, Any]]:
+        with self._times_lock:
+            self.times[backend].append(time.monotonic())
+        if backend in self.slow:
+            time.sleep(2.0)
+        return super().results(query, backend, max_results)
+
+
+def test_default_backends_are_ddgs_text_engines():
+    assert set(DEFAULT_BACKENDS) <= text_backends()
+
+
+def test_requests_to_one_backend_are_spaced():
+    fake = RecordingBackend(latency=0.0, throttle_rate=0.0)
+    searcher = ConcurrentSearcher(search_fn=fake, max_workers=8, backend_interval=0.05)
+
+    report = searcher.run([f"关键词{i}" for i in range(4)], ["duckduckgo", "brave"])
+
+    assert report.completed == 8
+    for times in fake.times.values():
+        gaps = [b - a for a, b in zip(sorted(times), sorted(times)[1:])]
+        assert len(gaps) == 3
+        assert min(gaps) >= 0.045
+    # 两个后端各自排队，互不等待
+    assert report.elapsed < 0.05 * 6
+
+
+def test_limiter_refuses_slots_after_deadline():
+    limiter = RateLimiter(interval=10.0)
+    deadline = time.monotonic() + 1.0
+    assert limiter.acquire("brave", deadline)
+    assert not limiter.acquire("brave", deadline)
+    assert limiter.acquire("yahoo", deadline)
+
+
+def test_throttled_task_gives_up_after_max_retries():
+    fake = FakeBackend(latency=0.0, throttle_rate=1.0)
+    searcher = ConcurrentSearcher(
+        search_fn=fake, backend_interval=0.0, max_retries=2, retry_base_delay=0.001
+    )
+
+    report = searcher.run(["关键词"], ["duckduckgo", "brave"])
+
+    assert report.completed == 0
+    assert len(report.errors) == 2
+    assert all("Throttled" in err for err in report.errors.values())
+    assert fake.calls == 2 * 3
+    assert report.retries == 2 * 2
+
+
+def test_deadline_returns_partial_results():
+    fake = RecordingBackend(slow=("yahoo",), latency=0.0, throttle_rate=0.0)
+    searcher = ConcurrentSearcher(search_fn=fake, backend_interval=0.0, deadline=0.3)
+
+    start = time.monotonic()
+    report = searcher.run(["关键词"], ["duckduckgo", "yahoo"])
+
+    assert time.monotonic() - start < 1.0
+    assert report.timed_out
+    assert report.completed == 1
+    assert report.results and {r.backend for r in report.results} == {"duckduckgo"}
+
+
+def test_stale_hits_are_traced_as_cache_hits(tmp_path):
+    keywords = [f"关键词{i}" for i in range(20)]
+    fake = FakeBackend(latency=0.05, throttle_rate=0.0)
+    # TTL 为 0：第一轮写入的结果第二轮全部是过期复用，后台刷新与查询同时进行
+    cache = SearchCache(tmp_path / "cache.sqlite3", ttl={"text": 0}, stale_while_revalidate=600)
+    with cache:
+        for name in ("cold", "stale"):
+            searcher = ConcurrentSearcher(
+                search_fn=fake,
+                backend_interval=0.0,
+                cache=cache,
+                tracer=Tracer(tmp_path / f"{name}.jsonl"),
+            )
+            searcher.run(keywords, ["duckduckgo"])
+            cache.wait()
+
+    def cache_hits(name: str) -> int:
+        spans = load(tmp_path / f"{name}.jsonl")
+        return sum(e["cache_hits"] for e in spans if e["name"] == "search.query")
+
+    assert cache.stats.stale_hits == 20
+    assert (cache_hits("cold"), cache_hits("stale")) == (0, 20)
@@ -0,0 +1,116 @@
+"""规则预处理基准测试：吞吐量（MB/s），以及在示例草稿上与 humanized.md 的对比。
+
+对比报告按段落对齐 draft.md 和 humanized.md，把被人工/模型改动过的段落当作参照：
+
+- 规则直接改对：预处理后与 humanized.md 完全一致的段落
+- 标记命中：被标记的段落中确实被改动的比例
+- 覆盖：被改动的段落中已经由规则改写或标记的比例
+
+用法：
+    python bench_prepass.py --size-mb 8
+    python bench_prepass.py --diff     # 同时打印预处理结果与 humanized.md 的差异
+"""
+
+from __future__ import annotations
+
+import argparse
+import difflib
+import re
+import time
+from pathlib import Path
+
+from prepass import COMBINED, PROSE, RULES, prepass
+
+_SPACE = re.compile(r"\s+")
+
+
+def _normalize(text: str) -> str:
+    return _SPACE.sub("", text)
+
+
+def bench_throughput(corpus: str, rounds: int) -> None:
+    size = len(corpus.encode("utf-8")) / 1e6
+    per_rule = [re.compile(rule.pattern, re.MULTILINE) for rule in RULES]
+
+    modes = {
+        # 对照：每条规则各扫一遍全文
+        "逐条规则": lambda: sum(len(p.findall(corpus)) for p in per_rule),
+        "合并正则": lambda: sum(1 for _ in COMBINED.finditer(corpus)),
+        "完整预处理": lambda: prepass(corpus),
+    }
+    print(f"吞吐量（语料 {size:.1f} MB）：")
+    for name, fn in modes.items():
+        best = float("inf")
+        for _ in range(rounds):
+            start = time.perf_counter()
+            fn()
+            best = min(best, time.perf_counter() - start)
+        print(f"  {name}：{size / best:.1f} MB/s")
+
+
+def compare(draft: str, humanized: str, show_diff: bool, name: str) -> None:
+    result = prepass(draft)
+    prose = [p for p in result.paragraphs if p.kind in PROSE]
+    target = [_normalize(p.text) for p in prepass(humanized).paragraphs if p.kind in PROSE]
+
+    matcher = difflib.SequenceMatcher(None, [_normalize(p.text) for p in prose], target, autojunk=False)
+    changed: set[int] = set()
+    for tag, i1, i2, _, _ in matcher.get_opcodes():
+        if tag in ("replace", "delete"):
+            changed.update(range(i1, i2))
+
+    target_set = set(target)
+    fixed = {
+        i for i in changed
+        if any(h.rewritten for h in prose[i].hits) and _normalize(prose[i].output) in target_set
+    }
+    flagged = {i for i, p in enumerate(prose) if p.score >= result.threshold}
+    touched = {i for i, p in enumerate(prose) if any(h.rewritten for h in p.hits)} | flagged
+    precision = len(flagged & changed) / len(flagged) if flagged else 0.0
+    recall = len(touched & changed) / len(changed) if changed else 0.0
+
+    print(
+        f"  {name}：段落 {len(prose)}，humanized 改动 {len(changed)}，"
+        f"规则直接改对 {len(fixed)}，标记 {len(flagged)}（命中率 {precision:.0%}），"
+        f"覆盖 {recall:.0%}，标记字数 {result.flagged_ratio():.0%}"
+    )
+    for i in sorted(changed - touched):
+        print(f"    未覆盖 第 {prose[i].line} 行：{prose[i].text[:40]}")
+    if show_diff:
+        lines = difflib.unified_diff(
+            result.text(mark=True).splitlines(),
+            humanized.splitlines(),
+            "prepass.md",
+            "humanized.md",
+            lineterm="",
+        )
+        for line in lines:
+            print(f"    {line}")
+
+
+def main() -> None:
+    default_examples = Path(__file__).resolve().parents[4] / "examples"
+    parser = argparse.ArgumentParser(description="规则预处理基准测试")
+    parser.add_argument("--examples", type=Path, default=default_examples, help="示例目录")
+    parser.add_argument("--size-mb", type=float, default=8.0, help="吞吐量测试的语料大小")
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--diff", action="store_true", help="打印预处理结果与 humanized.md 的差异")
+    args = parser.parse_args()
+
+    drafts = sorted(args.examples.glob("*/draft.md"))
+    print("示例对比：")
+    texts = []
+    for path in drafts:
+        draft = path.read_text(encoding="utf-8")
+        texts.append(draft)
+        humanized = path.with_name("humanized.md")
+        if humanized.exists():
+            compare(draft, humanized.read_text(encoding="utf-8"), args.diff, path.parent.name)
+
+    sample = "\n\n".join(texts)
+    repeat = max(1, int(args.size_mb * 1e6 / len(sample.encode("utf-8"))))
+    bench_throughput("\n\n".join([sample] * repeat), args.rounds)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,393 @@
+"""humanizer-cn 的规则预处理：一次线性扫描改写或标记 AI 痕迹，提示模型优先处理哪些段落。
+
+所有短语规则编译成一个带命名分组的正则，逐段扫描一次：
+
+- 可以安全删除的套话开头（"值得注意的是，""综上所述，"等）和正文里的行内加粗直接改写
+- 空泛大词、含糊的数据来源、冗长的副标题式标题等只标记，留给模型结合上下文改写
+- 结构检查与扫描同步完成：首先/其次/最后式的行文骨架、连续多句相同的开头
+
+代码块、配图和参考资料部分不处理。带 ``--mark`` 时在命中较多的段落前插入
+``<!-- humanize: 原因 -->``。标记只是给模型的提示，不限定改写范围：规则只认得固定的
+短语和句式，人工改动过的段落只有一部分会被覆盖（覆盖率见 ``bench_prepass.py``），
+humanizer-cn 仍要通读全文，未标记的段落同样可能需要改写。
+
+用法：
+    python prepass.py output/主题/draft.md -o output/主题/prepass.md --mark --report prepass.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import re
+import sys
+from collections import Counter, deque
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "_shared"))
+
+from tracing import open_tracer  # noqa: E402
+
+# 句首位置：段首、行首或句末标点之后
+_SENTENCE_START = r"(?:^|(?<=[。！？!?；;]))"
+
+
+@dataclass(frozen=True)
+class Rule:
+    name: str
+    label: str
+    pattern: str
+    # 匹配可能的首字符，用于合并正则的前置过滤
+    first: str
+    weight: float = 1.0
+    # 改写函数返回替换文本；为 None 时只标记
+    rewrite: Callable[[re.Match[str]], str] | None = None
+
+
+def _phrases(*words: str) -> str:
+    return "|".join(re.escape(w) for w in sorted(words, key=len, reverse=True))
+
+
+def _initials(*words: str) -> str:
+    return "".join(sorted({w[0] for w in words}))
+
+
+def _drop(match: re.Match[str]) -> str:
+    return ""
+
+
+def _unbold(match: re.Match[str]) -> str:
+    # 整行加粗通常是小标题或"参考资料："，行首（含列表项标记之后）的"**术语**："是释义列表，都保留
+    text = match.string
+    prefix = text[text.rfind("\n", 0, match.start()) + 1:match.start()]
+    line_start = not prefix or bool(_LIST_MARKER.fullmatch(prefix))
+    line_end = match.end() == len(text) or text[match.end()] == "\n"
+    if line_start and (line_end or text[match.end()] in "：:"):
+        return match.group(0)
+    return match.group("bold_text")
+
+
+FILLER_OPENERS = (
+    "值得注意的是", "值得一提的是", "需要指出的是", "需要注意的是", "不可否认",
+    "毋庸置疑", "众所周知", "不难发现", "显而易见", "综上所述", "总而言之",
+    "总的来说", "由此可见", "换句话说", "简而言之", "归根结底来说",
+)
+CLICHES = (
+    "至关重要", "举足轻重", "不可或缺", "深远的影响", "深远影响", "深入探讨",
+    "全方位", "多维度", "多元化", "赋能", "助力", "打造", "引领", "彰显",
+    "底层逻辑", "抓手", "闭环", "一站式", "无缝衔接", "日新月异", "蓬勃发展",
+    "方兴未艾", "与时俱进", "重要作用", "重要意义", "不言而喻", "息息相关",
+    "在当今社会", "在当今时代", "在这个快节奏的时代", "让我们一起", "让我们一同",
+    "希望本文", "希望这篇文章", "本文将", "接下来我们", "一起来看看",
+    "划时代", "里程碑式", "颠覆性", "革命性", "前所未有",
+)
+VAGUE_SOURCES = (
+    "根据数据统计", "据统计", "有关数据显示", "相关数据显示", "相关研究表明",
+    "有研究表明", "专家指出", "业内人士认为", "有关专家",
+)
+SCAFFOLD_MARKERS = ("首先", "其次", "再次", "最后", "第一", "第二", "第三", "一方面", "另一方面", "总之")
+
+RULES = (
+    # 只跳过、不处理的片段放在最前面，保证其中的文字不会被后面的规则匹配
+    Rule("link", "", r"!?\[[^\]\n]*\]\([^)\n]*\)|https?://\S+|`[^`\n]+`", "![h`", weight=0),
+    Rule(
+        "filler",
+        "套话开头",
+        _SENTENCE_START + rf"(?:{_phrases(*FILLER_OPENERS)})[，,：:]",
+        _initials(*FILLER_OPENERS),
+        rewrite=_drop,
+    ),
+    Rule("bold", "行内加粗", r"\*\*(?P<bold_text>[^*\n]{1,80})\*\*", "*", rewrite=_unbold),
+    Rule(
+        "scaffold",
+        "首先/其次式骨架",
+        _SENTENCE_START + rf"(?:{_phrases(*SCAFFOLD_MARKERS)})[，,、：:]",
+        _initials(*SCAFFOLD_MARKERS),
+        weight=0,
+    ),
+    Rule("cliche", "空泛大词", _phrases(*CLICHES), _initials(*CLICHES)),
+    Rule(
+        "cliche_pattern",
+        "空泛句式",
+        r"随着[^。！？\n]{1,16}的(?:不断|快速|飞速|迅速)?发展|扮演着[^。！？\n]{1,12}角色|在[^。！？\n]{1,10}的时代",
+        "随扮在",
+    ),
+    Rule("vague_source", "数据来源含糊", _phrases(*VAGUE_SOURCES), _initials(*VAGUE_SOURCES)),
+    Rule("not_but", "不是……而是", r"不是[^。！？\n]{1,20}[，,]\s*而是", "不", weight=0.5),
+    Rule("heading_subtitle", "标题带副标题", r"\A#{1,6}\s+[^\n：:]{2,}[：:][^\n]{6,}$", "#"),
+    Rule(
+        "heading_summary",
+        "总结式标题",
+        r"\A#{1,6}\s+(?:[一二三四五六七八九十]+、|\d+(?:\.\d+)*\s*)?(?:总结|结语|写在最后)",
+        "#",
+    ),
+)
+RULE_BY_NAME = {rule.name: rule for rule in RULES}
+# 先用首字符集合做零宽前置判断，绝大多数位置不必逐个尝试各条规则的分支
+_FIRST = re.escape("".join(sorted({c for rule in RULES for c in rule.first})))
+COMBINED = re.compile(
+    f"(?=[{_FIRST}])(?:" + "|".join(f"(?P<{rule.name}>{rule.pattern})" for rule in RULES) + ")",
+    re.MULTILINE,
+)
+
+_FENCE = re.compile(r"^\s*(```|~~~)")
+_SOURCES_TITLE = re.compile(r"^\W*(?:本文)?参考(?:资料|来源)\W*$")
+_SENTENCE = re.compile(r"[^。！？!?\n]+[。！？!?]*")
+_OPENER_STRIP = "\"'“”‘’「」『』*>-—# \t"
+_CJK_OPENER = re.compile(r"[㐀-鿿]{2}")
+_LIST_ITEM = re.compile(r"^(?:[-*+]|\d+\.)\s")
+_LIST_MARKER = re.compile(r"\s*(?:[-*+]|\d+\.)\s+")
+_IMAGE_ONLY = re.compile(r"^!\[[^\]]*\]\([^)]*\)\s*$")
+
+# 参与规则扫描的段落类型
+PROSE = ("body", "list", "heading")
+# 连续句子开头重复：窗口内同一开头出现的次数
+OPENER_WINDOW = 5
+OPENER_REPEAT = 3
+# 文章里出现至少这么多种骨架词才算骨架式行文
+SCAFFOLD_DISTINCT = 2
+
+
+@dataclass
+class Hit:
+    rule: str
+    label: str
+    text: str
+    offset: int
+    weight: float
+    rewritten: bool = False
+
+
+@dataclass
+class Paragraph:
+    line: int
+    text: str
+    gap: str
+    kind: str
+    output: str = ""
+    hits: list[Hit] = field(default_factory=list)
+
+    @property
+    def score(self) -> float:
+        return sum(h.weight for h in self.hits if not h.rewritten)
+
+    def reasons(self) -> list[str]:
+        return list(dict.fromkeys(h.label for h in self.hits if not h.rewritten and h.weight))
+
+
+@dataclass
+class PrepassResult:
+    paragraphs: list[Paragraph]
+    threshold: float
+
+    @property
+    def flagged(self) -> list[Paragraph]:
+        return [p for p in self.paragraphs if p.kind in PROSE and p.score >= self.threshold]
+
+    @property
+    def rewrites(self) -> int:
+        return sum(h.rewritten for p in self.paragraphs for h in p.hits)
+
+    def text(self, mark: bool = False) -> str:
+        flagged = {id(p) for p in self.flagged} if mark else set()
+        parts: list[str] = []
+        for p in self.paragraphs:
+            if id(p) in flagged:
+                parts.append(f"<!-- humanize: {'、'.join(p.reasons())} -->\n")
+            parts.append(p.output + p.gap)
+        return "".join(parts)
+
+    def flagged_ratio(self) -> float:
+        total = sum(len(p.text) for p in self.paragraphs if p.kind in PROSE)
+        return sum(len(p.text) for p in self.flagged) / total if total else 0.0
+
+    def summary(self) -> str:
+        return (
+            f"段落 {len(self.paragraphs)}，规则改写 {self.rewrites} 处，"
+            f"标记 {len(self.flagged)} 段供模型重点处理（约 {self.flagged_ratio():.0%} 字数）"
+        )
+
+    def report(self) -> dict[str, object]:
+        return {
+            "paragraphs": len(self.paragraphs),
+            "rewrites": self.rewrites,
+            "flagged_ratio": round(self.flagged_ratio(), 3),
+            "flagged": [
+                {
+                    "line": p.line,
+                    "score": p.score,
+                    "reasons": p.reasons(),
+                    "spans": [h.text for h in p.hits if not h.rewritten and h.weight],
+                    "excerpt": p.text[:60],
+                }
+                for p in self.flagged
+            ],
+        }
+
+
+def split_paragraphs(text: str) -> list[Paragraph]:
+    """按空行切分段落，围栏代码块整体作为一段；参考资料标题到下一个章节标题之间的内容不处理。"""
+    paragraphs: list[Paragraph] = []
+    block: list[str] = []
+    gap: list[str] = []
+    start = 1
+    in_fence = False
+    in_sources = False
+
+    def flush() -> None:
+        if not block and not gap:
+            return
+        body = "".join(block)
+        first = block[0].strip() if block else ""
+        if in_sources:
+            kind = "sources"
+        elif _FENCE.match(first):
+            kind = "code"
+        elif first.startswith("#"):
+            kind = "heading"
+        elif _LIST_ITEM.match(first):
+            kind = "list"
+        elif not first or _IMAGE_ONLY.match(first) or first.startswith(("|", "<", "---")):
+            kind = "other"
+        else:
+            kind = "body"
+        # 段落文本不含结尾换行，方便规则用 \A…$ 匹配整段
+        stripped = body.rstrip("\n")
+        paragraphs.append(
+            Paragraph(start, stripped, body[len(stripped):] + "".join(gap), kind, output=stripped)
+        )
+        block.clear()
+        gap.clear()
+
+    for number, line in enumerate(text.splitlines(keepends=True), 1):
+        if in_fence:
+            block.append(line)
+            if _FENCE.match(line):
+                in_fence = False
+            continue
+        if not line.strip():
+            gap.append(line)
+            continue
+        stripped = line.strip()
+        # 标题和代码块各自成段，其后即使没有空行也开始新段落
+        closed = bool(block) and (block[0].startswith("#") or bool(_FENCE.match(block[0])))
+        if gap or closed or line.startswith("#") or _FENCE.match(line) or _SOURCES_TITLE.match(stripped):
+            flush()
+            start = number
+        if _SOURCES_TITLE.match(stripped):
+            in_sources = True
+        elif line.startswith("#"):
+            # 参考资料之后出现新的章节标题时恢复处理
+            in_sources = False
+        if _FENCE.match(line):
+            in_fence = True
+        block.append(line)
+    flush()
+    return paragraphs
+
+
+def _scan(paragraph: Paragraph, scaffold: list[tuple[Paragraph, Hit]]) -> None:
+    pieces: list[str] = []
+    last = 0
+    text = paragraph.text
+    for match in COMBINED.finditer(text):
+        rule = RULE_BY_NAME[match.lastgroup or ""]
+        if rule.name == "link":
+            continue
+        hit = Hit(rule.name, rule.label, match.group(0), match.start(), rule.weight)
+        if rule.rewrite is not None:
+            replacement = rule.rewrite(match)
+            if replacement != match.group(0):
+                pieces.append(text[last:match.start()])
+                pieces.append(replacement)
+                last = match.end()
+                hit.rewritten = True
+            else:
+                continue
+        if rule.name == "scaffold":
+            scaffold.append((paragraph, hit))
+        paragraph.hits.append(hit)
+    pieces.append(text[last:])
+    paragraph.output = "".join(pieces)
+
+
+def _sentence_openers(paragraph: Paragraph) -> list[str]:
+    out = []
+    for line in paragraph.output.splitlines():
+        # 列表项开头相同是正常的排版，不算重复
+        if _LIST_ITEM.match(line):
+            continue
+        for sentence in _SENTENCE.findall(line):
+            opener = sentence.lstrip(_OPENER_STRIP)[:2]
+            if _CJK_OPENER.fullmatch(opener):
+                out.append(opener)
+    return out
+
+
+def prepass(text: str, threshold: float = 1.0) -> PrepassResult:
+    """扫描一遍草稿，返回改写后的段落和每段命中的规则。"""
+    paragraphs = split_paragraphs(text)
+    scaffold: list[tuple[Paragraph, Hit]] = []
+    window: deque[tuple[str, Paragraph]] = deque(maxlen=OPENER_WINDOW)
+    repeated: set[int] = set()
+
+    for paragraph in paragraphs:
+        if paragraph.kind not in PROSE:
+            window.clear()
+            continue
+        _scan(paragraph, scaffold)
+        if paragraph.kind != "body":
+            window.clear()
+            continue
+        for opener in _sentence_openers(paragraph):
+            window.append((opener, paragraph))
+            same = [p for o, p in window if o == opener]
+            if len(same) >= OPENER_REPEAT:
+                for p in same:
+                    if id(p) not in repeated:
+                        repeated.add(id(p))
+                        p.hits.append(Hit("opener", "句子开头重复", opener, 0, 1.0))
+
+    markers = Counter(h.text[:-1] for _, h in scaffold)
+    if len(markers) >= SCAFFOLD_DISTINCT:
+        for _, hit in scaffold:
+            hit.weight = 1.0
+    return PrepassResult(paragraphs, threshold)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="humanizer-cn 规则预处理")
+    parser.add_argument("draft", type=Path, help="待处理的 draft.md")
+    parser.add_argument("-o", "--output", type=Path, help="写出预处理后的稿件，默认输出到标准输出")
+    parser.add_argument("--report", type=Path, help="写出 JSON 报告")
+    parser.add_argument("--mark", action="store_true", help="在命中较多的段落前插入标记注释，提示模型重点处理（不限定改写范围）")
+    parser.add_argument("--threshold", type=float, default=1.0, help="段落命中权重达到该值时加标记")
+    args = parser.parse_args()
+
+    tracer = open_tracer(args.draft.parent, "humanizer-cn")
+    with tracer.span("humanizer-cn.prepass", file=args.draft.name) as span:
+        draft = args.draft.read_text(encoding="utf-8")
+        result = prepass(draft, args.threshold)
+        span.set(
+            bytes=len(draft.encode("utf-8")),
+            paragraphs=len(result.paragraphs),
+            rewrites=result.rewrites,
+            flagged=len(result.flagged),
+        )
+    text = result.text(mark=args.mark)
+    if args.output:
+        args.output.write_text(text, encoding="utf-8")
+    else:
+        sys.stdout.write(text)
+    if args.report:
+        args.report.write_text(
+            json.dumps(result.report(), ensure_ascii=False, indent=2), encoding="utf-8"
+        )
+    print(result.summary(), file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+import pytest
+
+from prepass import prepass, split_paragraphs
+
+DRAFT = """# 标题
+
+正文第一段。
+
+```python
+x = 1
+
+y = 2
+```
+紧跟代码块的段落。
+
+## 参考资料
+
+1. 值得注意的是，某某资料
+
+## 后记
+
+后记正文。
+"""
+
+
+def _hits(text: str) -> list[str]:
+    return [h.rule for p in prepass(text).paragraphs for h in p.hits]
+
+
+def test_split_paragraphs_keeps_fences_and_sources_apart():
+    paragraphs = split_paragraphs(DRAFT)
+
+    assert [(p.line, p.kind) for p in paragraphs] == [
+        (1, "heading"),
+        (3, "body"),
+        (5, "code"),
+        (10, "body"),
+        (12, "sources"),
+        (14, "sources"),
+        (16, "heading"),
+        (18, "body"),
+    ]
+    # 代码块里的空行不切段，紧跟在代码块后的文字另起一段
+    assert paragraphs[2].text == "```python\nx = 1\n\ny = 2\n```"
+    assert paragraphs[3].text == "紧跟代码块的段落。"
+    assert "".join(p.text + p.gap for p in paragraphs) == DRAFT
+
+
+def test_sources_section_is_left_untouched():
+    assert prepass(DRAFT).text() == DRAFT
+
+
+@pytest.mark.parametrize(
+    ("text", "expected"),
+    [
+        ("这是**强调**的词", "这是强调的词"),
+        ("- 这是**强调**的词", "- 这是强调的词"),
+        ("**术语**：解释", "**术语**：解释"),
+        ("- **术语**：解释", "- **术语**：解释"),
+        ("12. **术语**: 解释", "12. **术语**: 解释"),
+        ("**整行加粗的小标题**", "**整行加粗的小标题**"),
+    ],
+)
+def test_inline_bold_is_removed_but_definition_lists_are_kept(text, expected):
+    assert prepass(text).text() == expected
+
+
+def test_links_and_inline_code_are_not_scanned():
+    text = "参见[至关重要的一步](https://example.com/赋能)和`**原样**`，这里**加粗**。"
+
+    assert prepass(text).text() == "参见[至关重要的一步](https://example.com/赋能)和`**原样**`，这里加粗。"
+    assert _hits(text) == ["bold"]
+
+
+def test_scaffold_needs_several_distinct_markers():
+    single = prepass("首先，我们看数据。\n\n然后看结论。")
+    assert single.flagged == []
+
+    several = prepass("首先，我们看数据。\n\n其次，看结论。")
+    assert [p.line for p in several.flagged] == [1, 3]
+    assert several.flagged[0].reasons() == ["首先/其次式骨架"]
+
+
+def test_repeated_openers_are_flagged_across_paragraphs():
+    result = prepass("我们先看数据。我们再看结论。\n\n我们最后总结一下。")
+
+    assert [p.line for p in result.flagged] == [1, 3]
+    assert result.flagged[0].reasons() == ["句子开头重复"]
+
+
+def test_list_items_with_the_same_opener_are_not_repeats():
+    assert _hits("- 我们先看数据。\n- 我们再看结论。\n- 我们最后总结。") == []
@@ -0,0 +1,142 @@
+"""批量图片处理基准测试：示例配图 + 合成的多百万像素 JPEG。
+
+每种模式在独立子进程中运行，分别统计吞吐、峰值内存（RSS）和节省的字节数：
+
+- naive：逐张完整解码后缩放（原先的做法）
+- serial：单进程 + draft 降采样解码
+- pool：多进程 + draft 降采样解码
+
+用法：
+    python bench_process.py --large 8 --platform zhihu
+"""
+
+from __future__ import annotations
+
+import argparse
+import io
+import json
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from PIL import Image
+
+from process_images import IMAGE_SUFFIXES, PLATFORMS, process_directory
+
+
+def make_fixtures(target: Path, examples: Path, n_large: int) -> None:
+    target.mkdir(parents=True)
+    for i, src in enumerate(sorted(examples.glob("*/images/*"))):
+        shutil.copy(src, target / f"example_{i:02d}{src.suffix}")
+    for i in range(n_large):
+        # 渐变 + 噪声，避免过于好压缩
+        image = Image.linear_gradient("L").resize((6000, 4000)).convert("RGB")
+        noise = Image.effect_noise((6000, 4000), 40).convert("RGB")
+        image = Image.blend(image, noise, 0.3)
+        exif = Image.Exif()
+        exif[0x010F] = "BenchCamera"
+        image.save(target / f"large_{i:02d}.jpg", "JPEG", quality=92, exif=exif)
+
+
+def naive(images_dir: Path, platform: str) -> int:
+    spec = PLATFORMS[platform]
+    total = 0
+    for path in sorted(images_dir.iterdir()):
+        if path.suffix.lower() not in IMAGE_SUFFIXES:
+            continue
+        image = Image.open(path).convert("RGB")
+        if image.width > spec.max_width:
+            image = image.resize(
+                (spec.max_width, round(image.height * spec.max_width / image.width)),
+                Image.Resampling.LANCZOS,
+            )
+        buf = io.BytesIO()
+        image.save(buf, "JPEG", quality=85, exif=image.info.get("exif", b""))
+        path.write_bytes(buf.getvalue())
+        total += len(buf.getvalue())
+    return total
+
+
+def _self_peak_kb() -> int:
+    """当前进程的峰值 RSS（KB）。
+
+    ru_maxrss 会跨 exec 继承父进程的峰值，生成合成图片的父进程会污染结果，
+    所以优先读 /proc 中的 VmHWM。
+    """
+    try:
+        for line in Path("/proc/self/status").read_text().splitlines():
+            if line.startswith("VmHWM:"):
+                return int(line.split()[1])
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def run_mode(mode: str, images_dir: Path, platform: str) -> None:
+    """子进程入口：处理一遍目录并把统计信息以 JSON 打印到标准输出。"""
+    files = [p for p in images_dir.iterdir() if p.suffix.lower() in IMAGE_SUFFIXES]
+    before = sum(p.stat().st_size for p in files)
+    pixels = 0
+    for p in files:
+        with Image.open(p) as im:
+            pixels += im.width * im.height
+
+    start = time.perf_counter()
+    if mode == "naive":
+        after = naive(images_dir, platform)
+    else:
+        results = process_directory(images_dir, platform, workers=1 if mode == "serial" else None)
+        after = sum(r.bytes_after for r in results)
+    elapsed = time.perf_counter() - start
+
+    rss = max(_self_peak_kb(), resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss)
+    print(json.dumps({
+        "images": len(files),
+        "elapsed": elapsed,
+        "megapixels": pixels / 1e6,
+        "before": before,
+        "after": after,
+        "peak_rss_mb": rss / 1024,
+    }))
+
+
+def main() -> None:
+    default_examples = Path(__file__).resolve().parents[4] / "examples"
+    parser = argparse.ArgumentParser(description="批量图片处理基准测试")
+    parser.add_argument("--examples", type=Path, default=default_examples, help="示例目录")
+    parser.add_argument("--large", type=int, default=8, help="合成的 24MP JPEG 张数")
+    parser.add_argument("--platform", choices=sorted(PLATFORMS), default="zhihu")
+    parser.add_argument("--mode", choices=("naive", "serial", "pool"), help=argparse.SUPPRESS)
+    parser.add_argument("--dir", type=Path, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.mode:
+        run_mode(args.mode, args.dir, args.platform)
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        fixtures = Path(tmp) / "fixtures"
+        make_fixtures(fixtures, args.examples, args.large)
+        for mode in ("naive", "serial", "pool"):
+            work = Path(tmp) / mode
+            shutil.copytree(fixtures, work)
+            out = subprocess.run(
+                [sys.executable, __file__, "--mode", mode, "--dir", str(work),
+                 "--platform", args.platform],
+                check=True, capture_output=True, text=True,
+            ).stdout
+            s = json.loads(out)
+            print(
+                f"{mode:>6}：{s['images']} 张 / {s['megapixels']:.0f} MP，耗时 {s['elapsed']:.2f}s"
+                f"（{s['images'] / s['elapsed']:.1f} 张/秒），峰值 RSS {s['peak_rss_mb']:.0f} MB，"
+                f"{s['before'] / 1024:.0f} KB → {s['after'] / 1024:.0f} KB"
+                f"（节省 {1 - s['after'] / s['before']:.0%}）"
+            )
+
+
+if __name__ == "__main__":
+    main()
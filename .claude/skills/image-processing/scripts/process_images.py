@@ -0,0 +1,274 @@
+"""批量图片处理：把 images/ 目录里的配图规整为目标平台的尺寸和体积。
+
+- 多进程并行处理整个目录
+- JPEG 用 ``Image.draft()`` 在解码阶段直接按 1/2、1/4、1/8 缩小，大图不必完整解码
+- 按 EXIF 方向摆正，嵌入了非 sRGB 色彩配置（Display P3、Adobe RGB 等）的转换到 sRGB，
+  之后丢弃全部元数据
+- 按平台的宽度和体积上限尝试 JPEG 各档质量；透明图和非 JPEG 来源的图（截图、示意图）
+  同时尝试 PNG，取达标结果中最小的
+- 单张图片处理失败只记录错误，不影响同一目录的其他图片
+
+用法：
+    python process_images.py output/主题/images --platform zhihu
+"""
+
+from __future__ import annotations
+
+import argparse
+import io
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+
+from PIL import ExifTags, Image, ImageOps
+
+try:
+    from PIL import ImageCms
+except ImportError:  # Pillow 未带 LittleCMS 时只能直接丢弃色彩配置
+    ImageCms = None  # type: ignore[assignment]
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "_shared"))
+
+from tracing import open_tracer, peak_rss_kb  # noqa: E402
+
+
+@dataclass(frozen=True)
+class PlatformSpec:
+    max_width: int
+    max_bytes: int
+
+
+PLATFORMS = {
+    "zhihu": PlatformSpec(max_width=1280, max_bytes=500 * 1024),
+    "xiaohongshu": PlatformSpec(max_width=1080, max_bytes=1024 * 1024),
+    "wechat": PlatformSpec(max_width=1080, max_bytes=300 * 1024),
+}
+
+IMAGE_SUFFIXES = {".jpg", ".jpeg", ".png", ".webp", ".gif", ".bmp"}
+JPEG_QUALITIES = (88, 82, 76, 70, 62, 55)
+_SRGB = ImageCms.ImageCmsProfile(ImageCms.createProfile("sRGB")) if ImageCms else None
+
+
+@dataclass
+class ProcessResult:
+    source: Path
+    output: Path
+    original_size: tuple[int, int]
+    size: tuple[int, int]
+    bytes_before: int
+    bytes_after: int
+    format: str
+    quality: int | None
+    elapsed_ms: float = 0.0
+    error: str | None = None
+
+
+def load(path: Path, max_width: int) -> Image.Image:
+    """打开并缩放图片；JPEG 在解码时就按目标宽度降采样。"""
+    image = Image.open(path)
+    icc = image.info.get("icc_profile")
+    if image.format == "JPEG":
+        # EXIF 方向 5–8 要旋转 90°，摆正后的宽度是存储时的高度，draft 的目标也要对调
+        rotated = image.getexif().get(ExifTags.Base.Orientation, 1) in (5, 6, 7, 8)
+        width, height = (image.height, image.width) if rotated else image.size
+        # draft 只会缩小到不小于请求尺寸的 1/2^n，后面再精确缩放
+        scale = max_width / width
+        if scale < 1:
+            target = (max_width, max(1, int(height * scale)))
+            image.draft("RGB", target[::-1] if rotated else target)
+    image = ImageOps.exif_transpose(image)
+    if image.mode not in ("RGB", "RGBA", "L", "LA"):
+        # 调色板（GIF、量化过的 PNG）和 1 位图不支持 reduce，缩放前先转成真彩色
+        image = image.convert("RGBA" if _has_alpha(image) else "RGB")
+    if image.width > max_width:
+        height = max(1, round(image.height * max_width / image.width))
+        factor = image.width // max_width
+        if factor >= 2:
+            # 先整数倍 reduce（按块平均，很快），再用 LANCZOS 做最后一步
+            image = image.reduce(factor)
+        image = image.resize((max_width, height), Image.Resampling.LANCZOS)
+    if icc:
+        image = _to_srgb(image, icc)
+    return image
+
+
+def _to_srgb(image: Image.Image, icc: bytes) -> Image.Image:
+    """按嵌入的色彩配置转换到 sRGB；输出不带配置，直接丢弃会让广色域图片偏色。"""
+    if ImageCms is None or image.mode not in ("RGB", "RGBA"):
+        return image
+    try:
+        profile = ImageCms.ImageCmsProfile(io.BytesIO(icc))
+        if "srgb" in ImageCms.getProfileDescription(profile).lower():
+            return image
+        converted = ImageCms.profileToProfile(image, profile, _SRGB, outputMode=image.mode)
+    except (OSError, ImageCms.PyCMSError):
+        # 损坏或不支持的配置按 sRGB 处理
+        return image
+    return converted or image
+
+
+def _has_alpha(image: Image.Image) -> bool:
+    return image.mode in ("RGBA", "LA", "PA") or (
+        image.mode == "P" and "transparency" in image.info
+    )
+
+
+def encode(
+    image: Image.Image,
+    max_bytes: int,
+    try_png: bool = False,
+) -> tuple[bytes, str, int | None]:
+    """按「PNG → JPEG 高质量到低质量」依次尝试，返回不超过上限的编码中最小的一个。
+
+    透明图总是先试 PNG，达标就直接用；不透明图只在 ``try_png`` 时试 PNG（截图、示意图
+    往往比 JPEG 小，照片则大得多且编码慢），与第一个达标的 JPEG 比较大小。
+    都不达标时返回最小的一个。
+    """
+    attempts: list[tuple[bytes, str, int | None]] = []
+    if _has_alpha(image):
+        buf = io.BytesIO()
+        image.save(buf, "PNG", optimize=True)
+        attempts.append((buf.getvalue(), "PNG", None))
+        if len(attempts[-1][0]) <= max_bytes:
+            return attempts[-1]
+        background = Image.new("RGB", image.size, (255, 255, 255))
+        background.paste(image, mask=image.convert("RGBA").getchannel("A"))
+        image = background
+    else:
+        if image.mode != "RGB":
+            image = image.convert("RGB")
+        if try_png:
+            buf = io.BytesIO()
+            image.save(buf, "PNG", optimize=True)
+            attempts.append((buf.getvalue(), "PNG", None))
+
+    for quality in JPEG_QUALITIES:
+        buf = io.BytesIO()
+        # 不传 exif / icc_profile，输出不带任何元数据
+        image.save(buf, "JPEG", quality=quality, optimize=True, progressive=True)
+        attempts.append((buf.getvalue(), "JPEG", quality))
+        if len(attempts[-1][0]) <= max_bytes:
+            break
+    fitting = [a for a in attempts if len(a[0]) <= max_bytes]
+    return min(fitting or attempts, key=lambda a: len(a[0]))
+
+
+def process_image(path: Path, output_dir: Path, spec: PlatformSpec) -> ProcessResult:
+    """处理单张图片，扩展名按实际输出格式修正。"""
+    start = time.perf_counter()
+    bytes_before = path.stat().st_size
+    with Image.open(path) as probe:
+        original_size = probe.size
+        original_format = probe.format
+        has_metadata = bool(probe.info.get("exif") or probe.info.get("xmp") or len(probe.getexif()))
+    image = load(path, spec.max_width)
+    data, fmt, quality = encode(image, spec.max_bytes, try_png=original_format != "JPEG")
+
+    if (
+        image.size == original_size
+        and original_format in ("JPEG", "PNG")
+        and not has_metadata
+        and bytes_before <= min(len(data), spec.max_bytes)
+    ):
+        # 原图已经达标且更小，重新编码只会损失画质
+        data, fmt, quality = path.read_bytes(), original_format, None
+
+    output = output_dir / f"{path.stem}.{'png' if fmt == 'PNG' else 'jpg'}"
+    tmp = output.with_name(output.name + ".tmp")
+    tmp.write_bytes(data)
+    os.replace(tmp, output)
+    if output.resolve() != path.resolve() and output_dir.resolve() == path.parent.resolve():
+        path.unlink()
+    return ProcessResult(
+        source=path,
+        output=output,
+        original_size=original_size,
+        size=image.size,
+        bytes_before=bytes_before,
+        bytes_after=len(data),
+        format=fmt,
+        quality=quality,
+        elapsed_ms=round((time.perf_counter() - start) * 1000, 2),
+    )
+
+
+def _process_or_report(path: Path, output_dir: Path, spec: PlatformSpec) -> ProcessResult:
+    """处理单张图片；失败时返回带 ``error`` 的结果，不让一张坏图中断整批。"""
+    try:
+        return process_image(path, output_dir, spec)
+    except Exception as e:  # noqa: BLE001 - 单张失败不影响其他图片
+        size = path.stat().st_size if path.exists() else 0
+        return ProcessResult(
+            source=path,
+            output=path,
+            original_size=(0, 0),
+            size=(0, 0),
+            bytes_before=size,
+            bytes_after=size,
+            format="",
+            quality=None,
+            error=f"{type(e).__name__}: {e}",
+        )
+
+
+def process_directory(
+    images_dir: Path,
+    platform: str,
+    output_dir: Path | None = None,
+    workers: int | None = None,
+) -> list[ProcessResult]:
+    """用进程池处理目录下的全部图片；``output_dir`` 为空时原地替换。
+
+    处理失败的图片原样保留，对应结果的 ``error`` 记录原因。
+    """
+    spec = PLATFORMS[platform]
+    output_dir = output_dir or images_dir
+    output_dir.mkdir(parents=True, exist_ok=True)
+    paths = sorted(p for p in images_dir.iterdir() if p.suffix.lower() in IMAGE_SUFFIXES)
+    if workers == 1 or len(paths) <= 1:
+        return [_process_or_report(p, output_dir, spec) for p in paths]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(
+            pool.map(_process_or_report, paths, [output_dir] * len(paths), [spec] * len(paths))
+        )
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="批量规整配图")
+    parser.add_argument("images_dir", type=Path, help="图片目录，如 output/主题/images")
+    parser.add_argument("--platform", choices=sorted(PLATFORMS), default="zhihu")
+    parser.add_argument("-o", "--output-dir", type=Path, help="输出目录，默认原地替换")
+    parser.add_argument("--workers", type=int, default=None, help="进程数，默认 CPU 核数")
+    args = parser.parse_args()
+
+    tracer = open_tracer(args.images_dir.parent, "image-processing")
+    with tracer.span("image-processing", platform=args.platform) as span:
+        results = process_directory(args.images_dir, args.platform, args.output_dir, args.workers)
+        span.set(
+            files=len(results),
+            failed=sum(r.error is not None for r in results),
+            bytes=sum(r.bytes_before for r in results),
+            bytes_after=sum(r.bytes_after for r in results),
+            # 各图片在子进程中处理，逐张耗时和子进程的峰值内存单独记录
+            images=[{"file": r.output.name, "ms": r.elapsed_ms} for r in results],
+            children_peak_rss_kb=peak_rss_kb(children=True),
+        )
+    for r in results:
+        if r.error:
+            print(f"{r.source.name}：处理失败，保留原图（{r.error}）", file=sys.stderr)
+            continue
+        quality = f" q{r.quality}" if r.quality else ""
+        print(
+            f"{r.source.name} → {r.output.name}：{r.original_size[0]}x{r.original_size[1]} → "
+            f"{r.size[0]}x{r.size[1]}，{r.bytes_before} → {r.bytes_after} 字节（{r.format}{quality}）"
+        )
+        if r.output.name != r.source.name:
+            print(f"  注意：文章中的 {r.source.name} 引用需改为 {r.output.name}", file=sys.stderr)
+    return 1 if any(r.error for r in results) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
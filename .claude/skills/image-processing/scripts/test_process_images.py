@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+from PIL import ExifTags, Image, ImageDraw
+
+from process_images import PLATFORMS, encode, load, process_directory
+
+
+def _jpeg(path: Path, size: tuple[int, int], orientation: int) -> Path:
+    exif = Image.Exif()
+    exif[ExifTags.Base.Orientation] = orientation
+    Image.new("RGB", size, (200, 120, 40)).save(path, "JPEG", exif=exif)
+    return path
+
+
+@pytest.mark.parametrize("orientation", [5, 6, 7, 8])
+def test_rotated_jpeg_is_not_decoded_below_target_width(tmp_path, orientation):
+    path = _jpeg(tmp_path / "portrait.jpg", (3000, 2000), orientation)
+    assert load(path, 640).size == (640, 960)
+
+
+@pytest.mark.parametrize("orientation", [1, 3])
+def test_upright_jpeg_is_scaled_to_target_width(tmp_path, orientation):
+    path = _jpeg(tmp_path / "landscape.jpg", (3000, 2000), orientation)
+    assert load(path, 640).size == (640, 427)
+
+
+@pytest.mark.parametrize("mode", ["P", "1"])
+def test_palette_and_bilevel_images_are_scaled(tmp_path, mode):
+    image = Image.linear_gradient("L").resize((3000, 1000)).convert("RGB")
+    image = image.quantize(64) if mode == "P" else image.convert("1")
+    image.save(tmp_path / "wide.png")
+
+    loaded = load(tmp_path / "wide.png", 640)
+
+    assert loaded.size == (640, 213)
+    assert loaded.mode == "RGB"
+
+
+def test_broken_color_profile_is_ignored(tmp_path):
+    Image.new("RGB", (800, 600), (10, 20, 30)).save(tmp_path / "a.jpg", icc_profile=b"bogus")
+    assert load(tmp_path / "a.jpg", 640).size == (640, 480)
+
+
+def test_flat_diagram_is_kept_as_png_when_smaller():
+    image = Image.new("RGB", (1280, 800), "white")
+    draw = ImageDraw.Draw(image)
+    for i in range(8):
+        draw.rectangle((40 + i * 150, 100, 160 + i * 150, 700), outline="black", width=3)
+        draw.text((60 + i * 150, 380), f"step {i}", fill="black")
+
+    data, fmt, _ = encode(image, PLATFORMS["zhihu"].max_bytes, try_png=True)
+    jpeg, _, _ = encode(image, PLATFORMS["zhihu"].max_bytes)
+
+    assert fmt == "PNG"
+    assert len(data) < len(jpeg)
+
+
+def test_one_bad_image_does_not_stop_the_batch(tmp_path):
+    images = tmp_path / "images"
+    images.mkdir()
+    _jpeg(images / "image_001.jpg", (3000, 2000), 1)
+    (images / "image_002.jpg").write_bytes(b"not an image")
+
+    good, bad = process_directory(images, "zhihu", workers=2)
+
+    assert good.error is None and good.size == (1280, 853)
+    assert bad.error is not None
+    assert (images / "image_002.jpg").read_bytes() == b"not an image"
@@ -0,0 +1,111 @@
+"""图片下载的离线基准测试：用本地 HTTP 服务模拟图床。
+
+服务端提供混合候选：正常大图、重复图、小图、超大图、非图片页面，
+并为每个请求加上固定延迟以模拟网络往返。
+
+用法：
+    python bench_download.py --candidates 40 --keep 5
+"""
+
+from __future__ import annotations
+
+import argparse
+import io
+import tempfile
+import threading
+import time
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+from PIL import Image
+
+from image_download import ImageDownloader
+
+
+class SlowHandler(SimpleHTTPRequestHandler):
+    latency = 0.1
+
+    def do_GET(self) -> None:  # noqa: N802
+        time.sleep(self.latency)
+        super().do_GET()
+
+    def log_message(self, format: str, *args: object) -> None:  # noqa: A002
+        pass
+
+
+class QuietServer(ThreadingHTTPServer):
+    def handle_error(self, request: object, client_address: object) -> None:
+        # 下载器提前中断连接属于预期行为
+        pass
+
+
+def make_fixtures(root: Path, n: int) -> list[str]:
+    """生成候选文件，返回按排名排列的相对路径。"""
+
+    def jpeg(width: int, height: int) -> bytes:
+        # 放大的随机噪声块，保证感知哈希各不相同
+        image = Image.effect_noise((16, 12), 100).resize((width, height)).convert("RGB")
+        buf = io.BytesIO()
+        image.save(buf, "JPEG", quality=90)
+        return buf.getvalue()
+
+    duplicate = jpeg(800, 600)
+    names = []
+    for i in range(n):
+        kind = i % 5
+        if kind == 0:
+            name, data = f"dup_{i}.jpg", duplicate
+        elif kind == 1:
+            name, data = f"small_{i}.jpg", jpeg(120, 90)
+        elif kind == 2:
+            name, data = f"page_{i}.html", b"<html>not an image</html>"
+        elif kind == 3:
+            name, data = f"huge_{i}.bmp", b"BM" + bytes(3 * 1024 * 1024)
+        else:
+            name, data = f"ok_{i}.jpg", jpeg(1200, 800)
+        (root / name).write_bytes(data)
+        names.append(name)
+    return names
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="图片下载离线基准测试")
+    parser.add_argument("--candidates", type=int, default=40)
+    parser.add_argument("--keep", type=int, default=5)
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--latency", type=float, default=0.1, help="每个请求的模拟延迟（秒）")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp) / "www"
+        root.mkdir()
+        names = make_fixtures(root, args.candidates)
+        SlowHandler.latency = args.latency
+        server = QuietServer(("127.0.0.1", 0), partial(SlowHandler, directory=str(root)))
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        base = f"http://127.0.0.1:{server.server_address[1]}"
+
+        try:
+            for workers in (1, args.workers):
+                downloader = ImageDownloader(
+                    max_workers=workers, per_host=workers, max_bytes=1024 * 1024
+                )
+                start = time.perf_counter()
+                result = downloader.download(
+                    [f"{base}/{name}" for name in names],
+                    Path(tmp) / f"images_{workers}",
+                    keep=args.keep,
+                )
+                elapsed = time.perf_counter() - start
+                print(
+                    f"{workers:>2} 并发：保存 {len(result.saved)} 张，跳过 {len(result.rejected)} 张，"
+                    f"重复 {result.duplicates} 张，下载 {result.bytes_transferred} 字节，"
+                    f"耗时 {elapsed:.2f}s"
+                )
+        finally:
+            server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
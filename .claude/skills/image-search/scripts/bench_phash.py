@@ -0,0 +1,92 @@
+"""感知哈希索引基准测试：示例配图的指纹耗时与 10 万规模的查询延迟。
+
+用法：
+    python bench_phash.py --size 100000
+"""
+
+from __future__ import annotations
+
+import argparse
+import io
+import random
+import tempfile
+import time
+from array import array
+from pathlib import Path
+
+from PIL import Image, ImageDraw
+
+from phash_index import PerceptualIndex, dhash, dhash_bytes, hamming
+
+
+def bench_examples(examples: Path) -> None:
+    paths = sorted(examples.glob("*/images/*"))
+    start = time.perf_counter()
+    hashes = {p: dhash(Image.open(p)) for p in paths}
+    elapsed = time.perf_counter() - start
+    print(f"示例配图：{len(paths)} 张指纹耗时 {elapsed * 1000 / len(paths):.1f} ms/张")
+
+    # 模拟转载：缩小、重压缩、加水印后应当仍然命中
+    for p, value in hashes.items():
+        image = Image.open(p).convert("RGB")
+        image = image.resize((image.width * 2 // 3, image.height * 2 // 3))
+        ImageDraw.Draw(image).text((10, image.height - 30), "@watermark", fill=(255, 255, 255))
+        buf = io.BytesIO()
+        image.save(buf, "JPEG", quality=60)
+        variant = dhash_bytes(buf.getvalue())
+        nearest = min(hamming(variant, other) for q, other in hashes.items() if q != p)
+        print(
+            f"  {p.parent.parent.name}/{p.name}：变体距离 {hamming(value, variant)}，"
+            f"与其他图片最近距离 {nearest}"
+        )
+
+
+def bench_lookup(size: int, max_distance: int, queries: int) -> None:
+    rng = random.Random(0)
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        values = array("Q", (rng.getrandbits(64) for _ in range(size)))
+        # 直接写入索引文件，模拟已经积累了大量图片的本地库
+        (root / "hashes.bin").write_bytes(values.tobytes())
+        with (root / "meta.jsonl").open("w", encoding="utf-8") as f:
+            for i in range(size):
+                f.write(
+                    f'{{"sha256": "{i:064x}", "url": "https://img.example/{i}.jpg", '
+                    f'"file": "store/{i}.jpg", "width": 800, "height": 600}}\n'
+                )
+
+        start = time.perf_counter()
+        index = PerceptualIndex(root)
+        print(f"加载 {len(index)} 条指纹耗时 {time.perf_counter() - start:.2f}s")
+
+        probes = []
+        for _ in range(queries):
+            value = values[rng.randrange(size)]
+            for bit in rng.sample(range(64), rng.randint(0, max_distance)):
+                value ^= 1 << bit
+            probes.append(value)
+
+        start = time.perf_counter()
+        found = sum(bool(index.search(v, max_distance)) for v in probes)
+        elapsed = time.perf_counter() - start
+        print(
+            f"查询：{queries} 次（距离 ≤ {max_distance}），命中 {found} 次，"
+            f"平均 {elapsed * 1e6 / queries:.0f} µs/次"
+        )
+
+
+def main() -> None:
+    default_examples = Path(__file__).resolve().parents[4] / "examples"
+    parser = argparse.ArgumentParser(description="感知哈希索引基准测试")
+    parser.add_argument("--examples", type=Path, default=default_examples, help="示例目录")
+    parser.add_argument("--size", type=int, default=100000, help="索引规模")
+    parser.add_argument("--max-distance", type=int, default=6)
+    parser.add_argument("--queries", type=int, default=2000)
+    args = parser.parse_args()
+
+    bench_examples(args.examples)
+    bench_lookup(args.size, args.max_distance, args.queries)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,340 @@
+"""并发流式下载候选图片。
+
+- 共享 ``requests.Session`` 连接池（keep-alive），每个域名限制并发连接数
+- 流式读取响应：Content-Type 不是图片、体积超过上限时立即中断
+- 只读到图片头就解析宽高，尺寸不足或读完头部预算仍无法识别的候选不再下载剩余部分
+- 按内容哈希和感知哈希去重，输出目录里已有的配图也参与比较：每个配图位置单独调用一次时，
+  同一张图（含转载、加水印的版本）也不会重复保存为另一个 ``image_00N``
+- 传入 :class:`PerceptualIndex` 时，之前下载过的 URL 直接从本地图片库读取，相似图片用索引查找
+- 按候选排名编号，排在前面的 ``keep`` 张图确定后取消其余下载
+- 传入 ``Tracer`` 时每个候选记录一个 span（耗时、字节数、跳过原因）
+"""
+
+from __future__ import annotations
+
+import hashlib
+import io
+import threading
+from collections import defaultdict
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from contextlib import nullcontext
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING, Callable
+from urllib.parse import urlsplit
+
+import requests
+from PIL import Image, ImageFile
+from requests.adapters import HTTPAdapter
+
+from phash_index import PerceptualIndex, dhash, dhash_bytes, hamming
+
+if TYPE_CHECKING:
+    from tracing import Tracer
+
+USER_AGENT = (
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+    "(KHTML, like Gecko) Chrome/120.0 Safari/537.36"
+)
+EXTENSIONS = {"JPEG": "jpg", "PNG": "png", "WEBP": "webp", "GIF": "gif"}
+
+
+# 图片头的读取预算：JPEG 的 EXIF 段最多 64KB，再给 ICC 配置等留出余量
+HEADER_BYTES = 128 * 1024
+
+
+class Rejected(Exception):
+    """候选图片不符合要求，不再下载。"""
+
+
+@dataclass
+class Downloaded:
+    url: str
+    data: bytes
+    format: str
+    width: int
+    height: int
+    sha256: str
+    phash: int
+    from_store: bool = False
+
+
+@dataclass
+class DownloadResult:
+    saved: list[tuple[Path, Downloaded]]
+    rejected: dict[str, str]
+    duplicates: int
+    bytes_transferred: int
+    reused: int = 0
+
+
+class ImageDownloader:
+    """有界并发的图片下载器。"""
+
+    def __init__(
+        self,
+        max_workers: int = 8,
+        per_host: int = 2,
+        max_bytes: int = 5 * 1024 * 1024,
+        min_width: int = 400,
+        min_height: int = 200,
+        timeout: float = 10.0,
+        chunk_size: int = 16 * 1024,
+        header_bytes: int = HEADER_BYTES,
+        index: PerceptualIndex | None = None,
+        max_distance: int = 6,
+        tracer: Tracer | None = None,
+    ):
+        self.max_workers = max_workers
+        self.per_host = per_host
+        self.max_bytes = max_bytes
+        self.min_width = min_width
+        self.min_height = min_height
+        self.timeout = timeout
+        self.chunk_size = chunk_size
+        self.header_bytes = header_bytes
+        self.index = index
+        self.max_distance = max_distance
+        self.tracer = tracer
+
+        self.session = requests.Session()
+        self.session.headers["User-Agent"] = USER_AGENT
+        adapter = HTTPAdapter(pool_connections=max_workers, pool_maxsize=max_workers)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+        self._host_lock = threading.Lock()
+        self._host_slots: dict[str, threading.Semaphore] = defaultdict(
+            lambda: threading.Semaphore(self.per_host)
+        )
+    def fetch(
+        self,
+        url: str,
+        cancelled: threading.Event | None = None,
+        on_bytes: Callable[[int], None] | None = None,
+    ) -> Downloaded:
+        """下载单张图片；不符合要求时抛出 :class:`Rejected`。
+
+        ``on_bytes`` 在每读到一块响应体时以块大小调用，用于统计传输字节数。
+        """
+        local = self._from_store(url)
+        if local is not None:
+            return local
+        with self._host_lock:
+            slot = self._host_slots[urlsplit(url).netloc]
+        with slot:
+            if cancelled is not None and cancelled.is_set():
+                raise Rejected("已取消")
+            with self.session.get(url, stream=True, timeout=self.timeout) as resp:
+                resp.raise_for_status()
+                content_type = resp.headers.get("Content-Type", "")
+                if content_type and not content_type.startswith("image/"):
+                    raise Rejected(f"Content-Type 为 {content_type}")
+                length = int(resp.headers.get("Content-Length") or 0)
+                if length > self.max_bytes:
+                    raise Rejected(f"体积 {length} 字节超过上限")
+                return self._read_body(url, resp, cancelled, on_bytes)
+
+    def _traced_fetch(
+        self,
+        url: str,
+        cancelled: threading.Event,
+        parent: str | None,
+        on_bytes: Callable[[int], None],
+    ) -> Downloaded:
+        span_cm = self.tracer.span("image.fetch", parent, url=url) if self.tracer else nullcontext()
+        received = 0
+
+        def count(n: int) -> None:
+            nonlocal received
+            received += n
+            on_bytes(n)
+
+        with span_cm as span:
+            try:
+                image = self.fetch(url, cancelled, count)
+                if span is not None:
+                    span.set(from_store=image.from_store, size=f"{image.width}x{image.height}")
+                return image
+            finally:
+                # 被拒绝的候选也已经传输了部分字节，同样计入
+                if span is not None:
+                    span.set(bytes=received)
+
+    def _from_store(self, url: str) -> Downloaded | None:
+        if self.index is None:
+            return None
+        record = self.index.lookup_url(url)
+        data = self.index.load(record) if record else None
+        if record is None or data is None:
+            return None
+        with Image.open(io.BytesIO(data)) as image:
+            fmt = image.format or ""
+        return Downloaded(
+            url=url,
+            data=data,
+            format=fmt,
+            width=record.width,
+            height=record.height,
+            sha256=record.sha256,
+            phash=dhash_bytes(data),
+            from_store=True,
+        )
+
+    def _read_body(
+        self,
+        url: str,
+        resp: requests.Response,
+        cancelled: threading.Event | None,
+        on_bytes: Callable[[int], None] | None,
+    ) -> Downloaded:
+        parser = ImageFile.Parser()
+        chunks: list[bytes] = []
+        size = 0
+        checked = False
+        try:
+            for chunk in resp.iter_content(self.chunk_size):
+                size += len(chunk)
+                if on_bytes is not None:
+                    on_bytes(len(chunk))
+                if size > self.max_bytes:
+                    raise Rejected(f"体积超过 {self.max_bytes} 字节")
+                if cancelled is not None and cancelled.is_set():
+                    raise Rejected("已取消")
+                chunks.append(chunk)
+                if not checked:
+                    parser.feed(chunk)
+                    if parser.image is not None:
+                        # 读到图片头即可判断尺寸，尺寸不足不再继续下载
+                        self._check_size(*parser.image.size)
+                        checked = True
+                    elif size >= self.header_bytes:
+                        raise Rejected(f"读取 {size} 字节后仍无法识别图片格式")
+        finally:
+            try:
+                parser.close()
+            except Exception:  # noqa: BLE001 - 只用于读取图片头
+                pass
+
+        image = parser.image
+        if image is None:
+            raise Rejected("无法识别的图片格式")
+        if not checked:
+            self._check_size(*image.size)
+        data = b"".join(chunks)
+        return Downloaded(
+            url=url,
+            data=data,
+            format=image.format or "",
+            width=image.size[0],
+            height=image.size[1],
+            sha256=hashlib.sha256(data).hexdigest(),
+            phash=dhash_bytes(data),
+        )
+
+    def _existing(self, output_dir: Path, overwrite: range) -> dict[str, int]:
+        """输出目录里已有的配图（本次要覆盖的编号除外），返回内容哈希 → 感知哈希。"""
+        taken: dict[str, int] = {}
+        for path in sorted(output_dir.glob("image_*")):
+            number = path.stem.removeprefix("image_")
+            ext = path.suffix.lstrip(".").lower()
+            if not number.isdigit() or int(number) in overwrite or ext not in EXTENSIONS.values():
+                continue
+            data = path.read_bytes()
+            sha256 = hashlib.sha256(data).hexdigest()
+            try:
+                with Image.open(io.BytesIO(data)) as image:
+                    size = image.size
+                    value = dhash(image)
+            except OSError:
+                continue
+            taken[sha256] = value
+            if self.index is not None and self.index.lookup_sha(sha256) is None:
+                # 手动放进来或建库之前下载的配图也登记进索引，之后才能按相似度查到
+                self.index.add(data, value, path.resolve().as_uri(), sha256, ext, size)
+        return taken
+
+    def _is_duplicate(self, image: Downloaded, taken: dict[str, int]) -> bool:
+        if image.sha256 in taken:
+            return True
+        if self.index is not None:
+            # 已有和已保存的配图都在索引里，用多段索引找相似图片再看是不是其中之一
+            hits = self.index.search(image.phash, self.max_distance)
+            return any(self.index.records[idx].sha256 in taken for idx, _ in hits)
+        return any(hamming(image.phash, value) <= self.max_distance for value in taken.values())
+
+    def _check_size(self, width: int, height: int) -> None:
+        if width < self.min_width or height < self.min_height:
+            raise Rejected(f"尺寸 {width}x{height} 过小")
+
+    def download(
+        self,
+        urls: list[str],
+        output_dir: Path,
+        keep: int = 5,
+        start_index: int = 1,
+    ) -> DownloadResult:
+        """并发下载候选 URL，按排名保存前 ``keep`` 张与输出目录中已有配图都不重复的图片。"""
+        output_dir.mkdir(parents=True, exist_ok=True)
+        taken = self._existing(output_dir, range(start_index, start_index + keep))
+        cancelled = threading.Event()
+        outcomes: dict[int, Downloaded | Exception] = {}
+        saved: list[tuple[Path, Downloaded]] = []
+        rejected: dict[str, str] = {}
+        duplicates = 0
+        reused = 0
+        next_rank = 0
+        # 本次调用的传输字节数；同一个下载器会被多次调用（每个配图位置一次）
+        transferred = [0]
+        transferred_lock = threading.Lock()
+        parent = self.tracer.current() if self.tracer else None
+
+        def count(n: int) -> None:
+            with transferred_lock:
+                transferred[0] += n
+
+        pool = ThreadPoolExecutor(max_workers=self.max_workers)
+        try:
+            futures: dict[Future, int] = {
+                pool.submit(self._traced_fetch, url, cancelled, parent, count): i
+                for i, url in enumerate(urls)
+            }
+            pending = set(futures)
+            while pending and len(saved) < keep:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    try:
+                        outcomes[futures[future]] = future.result()
+                    except Exception as e:  # noqa: BLE001 - 单张失败不影响其他候选
+                        outcomes[futures[future]] = e
+                # 按排名顺序处理已完成的前缀，保证编号稳定
+                while next_rank in outcomes and len(saved) < keep:
+                    outcome = outcomes.pop(next_rank)
+                    url = urls[next_rank]
+                    next_rank += 1
+                    if isinstance(outcome, Exception):
+                        rejected[url] = str(outcome) or type(outcome).__name__
+                    elif self._is_duplicate(outcome, taken):
+                        duplicates += 1
+                    else:
+                        taken[outcome.sha256] = outcome.phash
+                        ext = EXTENSIONS.get(outcome.format, "jpg")
+                        path = output_dir / f"image_{start_index + len(saved):03d}.{ext}"
+                        path.write_bytes(outcome.data)
+                        saved.append((path, outcome))
+                        if outcome.from_store:
+                            reused += 1
+                        elif self.index is not None:
+                            self.index.add(
+                                outcome.data,
+                                outcome.phash,
+                                url,
+                                outcome.sha256,
+                                ext,
+                                (outcome.width, outcome.height),
+                            )
+        finally:
+            cancelled.set()
+            pool.shutdown(wait=True, cancel_futures=True)
+
+        return DownloadResult(saved, rejected, duplicates, transferred[0], reused)
@@ -0,0 +1,135 @@
+"""image-search：用 DDGS 搜索候选配图，结果经共享搜索缓存读写。
+
+用法：
+    python image_search.py "传统酱油酿造工艺" -o candidates.json
+    python image_search.py "传统酱油酿造工艺" --download output/主题/images --keep 1
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from pathlib import Path
+from typing import Any, Callable
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "_shared"))
+
+from image_download import ImageDownloader  # noqa: E402
+from phash_index import DEFAULT_ROOT, PerceptualIndex  # noqa: E402
+from search_cache import DEFAULT_PATH, SearchCache  # noqa: E402
+from tracing import open_tracer  # noqa: E402
+
+# (query, region, timelimit, max_results) -> DDGS 图片结果
+ImageSearchFn = Callable[[str, str, "str | None", int], "list[dict[str, Any]]"]
+
+
+def ddgs_images(
+    query: str,
+    region: str,
+    timelimit: str | None,
+    max_results: int,
+) -> list[dict[str, Any]]:
+    from ddgs import DDGS
+
+    return DDGS().images(query, region=region, timelimit=timelimit, max_results=max_results)
+
+
+def search_images(
+    query: str,
+    region: str = "cn-zh",
+    timelimit: str | None = None,
+    max_results: int = 30,
+    cache: SearchCache | None = None,
+    search_fn: ImageSearchFn = ddgs_images,
+) -> list[dict[str, Any]]:
+    """返回候选图片列表，每项包含 title / image / thumbnail / url / width / height 等字段。
+
+    ``search_fn`` 可注入，离线基准测试时用本地假后端替换 ``ddgs``。
+    """
+
+    def fetch() -> list[dict[str, Any]]:
+        return search_fn(query, region, timelimit, max_results)
+
+    if cache is None:
+        return fetch()
+    return cache.get_or_fetch("images", query, "auto", region, timelimit, max_results, fetch)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="DDGS 图片搜索")
+    parser.add_argument("query", help="图片搜索关键词")
+    parser.add_argument("-o", "--output", type=Path, help="候选列表 JSON 输出路径，默认打印到标准输出")
+    parser.add_argument("--region", default="cn-zh")
+    parser.add_argument("--timelimit", default=None, help="时间范围：d / w / m / y")
+    parser.add_argument("--max-results", type=int, default=30)
+    parser.add_argument("--cache", type=Path, default=DEFAULT_PATH, help="搜索缓存数据库路径")
+    parser.add_argument("--no-cache", action="store_true", help="不读写搜索缓存")
+    parser.add_argument("--download", type=Path, metavar="DIR", help="下载图片到该目录")
+    parser.add_argument("--keep", type=int, default=1, help="保存的图片张数")
+    parser.add_argument("--start-index", type=int, default=1, help="image_00N 的起始编号")
+    parser.add_argument("--max-bytes", type=int, default=5 * 1024 * 1024, help="单张图片体积上限")
+    parser.add_argument("--min-width", type=int, default=400)
+    parser.add_argument("--min-height", type=int, default=200)
+    parser.add_argument("--store", type=Path, default=DEFAULT_ROOT, help="本地图片库目录")
+    parser.add_argument("--no-store", action="store_true", help="不读写本地图片库")
+    parser.add_argument(
+        "--max-distance", type=int, default=6, help="感知哈希汉明距离不超过该值视为同一张图"
+    )
+    args = parser.parse_args()
+
+    # 追踪记录写在文章目录（images/ 或候选列表所在目录）
+    article_dir = args.download.parent if args.download else args.output and args.output.parent
+    tracer = open_tracer(article_dir, "image-search")
+    cache = None if args.no_cache else SearchCache(args.cache)
+    with tracer.span("image-search.search", query=args.query) as span:
+        candidates = search_images(args.query, args.region, args.timelimit, args.max_results, cache)
+        span.set(candidates=len(candidates))
+        if cache:
+            span.set(cache_hits=cache.stats.hits + cache.stats.stale_hits)
+    text = json.dumps(candidates, ensure_ascii=False, indent=2)
+    if args.output:
+        args.output.write_text(text, encoding="utf-8")
+    else:
+        print(text)
+    if cache:
+        print(f"缓存：{cache.stats.summary()}", file=sys.stderr)
+        cache.close()
+
+    if args.download and candidates:
+        downloader = ImageDownloader(
+            max_bytes=args.max_bytes,
+            min_width=args.min_width,
+            min_height=args.min_height,
+            index=None if args.no_store else PerceptualIndex(args.store),
+            max_distance=args.max_distance,
+            tracer=tracer,
+        )
+        with tracer.span("image-search.download", query=args.query) as span:
+            result = downloader.download(
+                [c["image"] for c in candidates if c.get("image")],
+                args.download,
+                keep=args.keep,
+                start_index=args.start_index,
+            )
+            span.set(
+                bytes=result.bytes_transferred,
+                saved=len(result.saved),
+                rejected=len(result.rejected),
+                duplicates=result.duplicates,
+                reused=result.reused,
+            )
+        for path, image in result.saved:
+            print(f"已保存 {path}（{image.width}x{image.height}，{len(image.data)} 字节）", file=sys.stderr)
+        print(
+            f"跳过 {len(result.rejected)} 张，重复 {result.duplicates} 张，"
+            f"从本地图片库复用 {result.reused} 张，"
+            f"共下载 {result.bytes_transferred} 字节",
+            file=sys.stderr,
+        )
+        return 0 if result.saved else 1
+    return 0 if candidates else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,143 @@
+from __future__ import annotations
+
+import io
+import sys
+import threading
+from functools import partial
+from pathlib import Path
+
+import pytest
+from PIL import Image, ImageDraw
+
+from bench_download import QuietServer, SlowHandler, make_fixtures
+from image_download import HEADER_BYTES, ImageDownloader
+from phash_index import PerceptualIndex
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "_shared"))
+
+from tracing import Tracer, load  # noqa: E402
+
+
+class FastHandler(SlowHandler):
+    latency = 0.0
+
+
+@pytest.fixture
+def host(tmp_path: Path):
+    root = tmp_path / "www"
+    root.mkdir()
+    server = QuietServer(("127.0.0.1", 0), partial(FastHandler, directory=str(root)))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        yield root, f"http://127.0.0.1:{server.server_address[1]}"
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def _watermarked(data: bytes) -> bytes:
+    """模拟转载：右下角加水印后重新压缩。"""
+    image = Image.open(io.BytesIO(data)).convert("RGB")
+    draw = ImageDraw.Draw(image)
+    right, bottom = image.size
+    draw.rectangle((right - 160, bottom - 40, right - 10, bottom - 10), fill="white")
+    draw.text((right - 150, bottom - 35), "@repost", fill="black")
+    buf = io.BytesIO()
+    image.save(buf, "JPEG", quality=75)
+    return buf.getvalue()
+
+
+def test_unrecognized_body_stops_after_header_budget(host, tmp_path):
+    root, base = host
+    names = make_fixtures(root, 5)
+    huge = next(n for n in names if n.startswith("huge_"))
+    downloader = ImageDownloader(max_workers=1)
+
+    result = downloader.download([f"{base}/{huge}"], tmp_path / "images", keep=1)
+
+    assert result.saved == []
+    assert "无法识别" in result.rejected[f"{base}/{huge}"]
+    assert result.bytes_transferred < HEADER_BYTES + downloader.chunk_size
+
+
+def test_bytes_transferred_is_per_call(host, tmp_path):
+    root, base = host
+    names = make_fixtures(root, 10)
+    ok = [f"{base}/{n}" for n in names if n.startswith("ok_")]
+    downloader = ImageDownloader(max_workers=1)
+
+    first = downloader.download(ok[:1], tmp_path / "images", keep=1, start_index=1)
+    second = downloader.download(ok[1:], tmp_path / "images", keep=1, start_index=2)
+
+    assert first.bytes_transferred == (root / Path(ok[0]).name).stat().st_size
+    assert second.bytes_transferred == (root / Path(ok[1]).name).stat().st_size
+
+
+@pytest.mark.parametrize("with_index", [True, False])
+def test_sequential_calls_skip_reuploads_of_earlier_images(host, tmp_path, with_index):
+    root, base = host
+    names = make_fixtures(root, 10)
+    first, second = (n for n in names if n.startswith("ok_"))
+    (root / "repost.jpg").write_bytes(_watermarked((root / first).read_bytes()))
+    index = PerceptualIndex(tmp_path / "store") if with_index else None
+    downloader = ImageDownloader(max_workers=1, index=index)
+    images = tmp_path / "article" / "images"
+
+    downloader.download([f"{base}/{first}"], images, keep=1, start_index=1)
+    result = downloader.download(
+        [f"{base}/repost.jpg", f"{base}/{second}"], images, keep=1, start_index=2
+    )
+
+    assert result.duplicates == 1
+    assert [path.name for path, _ in result.saved] == ["image_002.jpg"]
+    assert (images / "image_002.jpg").read_bytes() == (root / second).read_bytes()
+
+
+def test_images_added_by_hand_are_indexed_and_skipped(host, tmp_path):
+    root, base = host
+    names = make_fixtures(root, 10)
+    first, second = (n for n in names if n.startswith("ok_"))
+    (root / "repost.jpg").write_bytes(_watermarked((root / first).read_bytes()))
+    images = tmp_path / "article" / "images"
+    images.mkdir(parents=True)
+    (images / "image_001.jpg").write_bytes((root / first).read_bytes())
+    index = PerceptualIndex(tmp_path / "store")
+    downloader = ImageDownloader(max_workers=1, index=index)
+
+    result = downloader.download(
+        [f"{base}/repost.jpg", f"{base}/{second}"], images, keep=1, start_index=2
+    )
+
+    assert result.duplicates == 1
+    assert len(index) == 2
+
+
+def test_rerunning_a_slot_may_save_the_same_image(host, tmp_path):
+    root, base = host
+    names = make_fixtures(root, 5)
+    ok = next(n for n in names if n.startswith("ok_"))
+    downloader = ImageDownloader(max_workers=1)
+    images = tmp_path / "images"
+
+    downloader.download([f"{base}/{ok}"], images, keep=1, start_index=1)
+    result = downloader.download([f"{base}/{ok}"], images, keep=1, start_index=1)
+
+    assert result.duplicates == 0
+    assert [path.name for path, _ in result.saved] == ["image_001.jpg"]
+
+
+def test_fetch_spans_count_bytes_of_rejected_candidates(host, tmp_path):
+    root, base = host
+    names = make_fixtures(root, 5)
+    tracer = Tracer(tmp_path / "trace.jsonl")
+    downloader = ImageDownloader(max_workers=2, tracer=tracer)
+
+    # 排在最后的才是可用的图，前面被拒绝的候选都会读完再轮到它
+    ranked = [n for n in names if not n.startswith(("dup_", "ok_"))]
+    ranked += [n for n in names if n.startswith("ok_")]
+    result = downloader.download([f"{base}/{n}" for n in ranked], tmp_path / "images", keep=1)
+
+    assert len(result.rejected) == 3
+    spans = [e for e in load(tmp_path / "trace.jsonl") if e["name"] == "image.fetch"]
+    assert any("error" in e and e["bytes"] > 0 for e in spans)
+    assert sum(e["bytes"] for e in spans) == result.bytes_transferred